@@ -0,0 +1,42 @@
+"""Звірка екстракторів вакансії: lxml проти reference, поля що відрізняються, і час CPU.
+
+    python bench/job_parser.py [fixture.html ...]
+"""
+import os
+import sys
+import time
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper_workua import parse_workua_job
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _cpu_per_call(html: str, mode: str, rounds: int) -> float:
+    t = time.process_time()
+    for _ in range(rounds):
+        parse_workua_job(html, "fixture", mode)
+    return (time.process_time() - t) / rounds
+
+
+def compare(path: str, rounds: int = 20) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    new = parse_workua_job(html, "fixture", "lxml")
+    ref = parse_workua_job(html, "fixture", "reference")
+    t_new = _cpu_per_call(html, "lxml", rounds)
+    t_ref = _cpu_per_call(html, "reference", rounds)
+    return {
+        "fixture": os.path.basename(path),
+        "diff": {k: {"lxml": new[k], "reference": ref[k]} for k in new if new[k] != ref[k]},
+        "cpu_ms_reference": round(t_ref * 1000, 3),
+        "cpu_ms_lxml": round(t_new * 1000, 3),
+        "speedup": round(t_ref / t_new, 1) if t_new else None,
+    }
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or [os.path.join(FIXTURES_DIR, "job_python.html")]
+    print(json.dumps([compare(p) for p in paths], ensure_ascii=False, indent=2))
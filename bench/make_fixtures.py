@@ -0,0 +1,158 @@
+"""Детерміновано генерує HTML-фікстури для bench/ (звичайні, великі й патологічні).
+
+    python bench/make_fixtures.py
+"""
+import os
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+TITLES = [
+    "Python Developer", "Senior Python Engineer", "Junior Python/Django розробник",
+    "Backend Developer (Python, FastAPI)", "Data Engineer (Python)", "Middle Python Developer",
+    "Python-програміст", "QA Automation Engineer (Python)", "Full Stack Developer (Django + React)",
+    "ML Engineer",
+]
+COMPANIES = [
+    "SoftServe", "EPAM Systems", "GlobalLogic", "Intellias", "ТОВ «Софтлайн»",
+    "N-iX", "Ciklum", "DataArt", "Luxoft", "ПриватБанк",
+]
+EMPLOYMENT = ["Повна зайнятість", "Неповна зайнятість", "Дистанційна робота",
+              "Без досвіду", "Готові взяти студента", "Офіс"]
+CITIES = ["Київ", "Львів", "Дистанційно", "Харків", "Одеса", "Дніпро"]
+
+
+def _card(rnd: random.Random, i: int) -> str:
+    jid = 7200000 + i * 37
+    title = rnd.choice(TITLES)
+    company = rnd.choice(COMPANIES)
+    salary = rnd.choice([
+        "",
+        '<span class="strong-600">40&nbsp;000&nbsp;–&nbsp;60&nbsp;000 грн</span>',
+        '<span class="strong-600">35 000 грн</span>',
+        '<span class="strong-600">від 25 000 грн</span>',
+    ])
+    emp = ". ".join(rnd.sample(EMPLOYMENT, 2))
+    if i % 3:
+        co = f'<a href="/jobs/by-company/{1000 + i}/company/" class="link-muted">{company}</a>'
+    else:
+        co = f'<span class="strong-600">{company}</span>'
+    return f'''
+      <div class="card card-hover card-search card-visited wordwrap job-link js-job-link-blank mt-lg" id="job-{jid}">
+        <div class="flex flex-align-center">
+          <div class="mb-xs"><span class="label label-orange-light">Гаряча</span> <time datetime="2025-10-0{1 + i % 9} 10:00:00">{1 + i % 9} жов</time></div>
+        </div>
+        <h2 class="my-0"><a href="/jobs/{jid}/" title="{title}, вакансія від {1 + i % 9} жовтня 2025">{title}</a></h2>
+        <div class="mt-xs">{salary}</div>
+        <div class="mt-xs"><span class="mr-xs">{co}</span><span class="mr-xs">{rnd.choice(CITIES)}</span></div>
+        <p class="ellipsis ellipsis-line ellipsis-line-3 text-default-7 mb-0">{emp}. Шукаємо розробника з досвідом роботи з Python від {1 + i % 4} років, знання Django/FastAPI, PostgreSQL, Docker.</p>
+        <div class="add-top-xs"><span class="text-default-7">Відгукнутися</span> <a href="/jobs/{jid}/#apply" rel="nofollow">Відгукнутися на вакансію</a></div>
+      </div>'''
+
+
+def _nest(inner: str, depth: int, cls: str = "wrap") -> str:
+    for d in range(depth):
+        inner = f'<div class="{cls}-{d}">{inner}</div>'
+    return inner
+
+
+def search_page(cards: int, depth: int, seed: int = 7, wrapper_cls: str = "wrap") -> str:
+    rnd = random.Random(seed)
+    body = "".join(_card(rnd, i) for i in range(cards))
+    sidebar = "".join(
+        f'<div class="card card-indent-xs"><h3>Фільтр {k}</h3><ul>'
+        + "".join(f'<li><a href="/jobs/?category={k * 10 + j}">Категорія {j}</a></li>' for j in range(12))
+        + "</ul></div>"
+        for k in range(6)
+    )
+    inner = (
+        '<div class="row"><div class="col-md-8"><h1>Робота Python</h1><div id="pjax-jobs-list">'
+        + body
+        + '<ul class="pagination"><li><a href="/jobs-python/?page=2">2</a></li></ul></div></div>'
+        + '<div class="col-md-4">' + sidebar + "</div></div>"
+    )
+    return f'''<!DOCTYPE html>
+<html lang="uk"><head><meta charset="utf-8"><title>Робота Python — вакансії на Work.ua</title>
+<meta property="og:description" content="Знайдено 412 вакансій Python">
+<script>window.dataLayer=[{{"page":"search"}}];</script>
+</head><body>
+<header class="navbar"><a href="/">Work.ua</a> <a href="/jobs/">Вакансії</a> <a href="/resumes/">Резюме</a></header>
+<main>
+{_nest(inner, depth, wrapper_cls)}
+</main>
+<footer><div class="container"><a href="/about/">Про нас</a></div></footer>
+</body></html>
+'''
+
+
+_JOB_LD = '''
+<script type="application/ld+json">{"@context": "https://schema.org", "@type": "JobPosting",
+ "title": "Python Developer", "datePosted": "2025-10-01T09:15:00+03:00", "validThrough": "2025-11-01",
+ "employmentType": ["FULL_TIME"], "jobLocationType": "TELECOMMUTE",
+ "hiringOrganization": {"@type": "Organization", "name": "SoftServe"},
+ "baseSalary": {"@type": "MonetaryAmount", "currency": "UAH",
+  "value": {"@type": "QuantitativeValue", "minValue": 50000, "maxValue": 70000, "unitText": "MONTH"}}}</script>'''
+
+
+def job_page(sections: int, items: int, seed: int = 11, pathological: bool = False, jsonld: bool = False) -> str:
+    rnd = random.Random(seed)
+    heads = ["Твої задачі:", "Що ми очікуємо:", "Буде плюсом:", "Ми пропонуємо:", "Про проєкт:"]
+    words = ("розробка підтримка сервісів оптимізація запитів інтеграція API тестування "
+             "документація рев'ю архітектура моніторинг Python Django PostgreSQL Docker").split()
+    parts = ["<p>Ми — продуктова команда, що розробляє платформу аналітики для ритейлу.</p>"]
+    for s in range(sections):
+        parts.append(f"<p><b>{heads[s % len(heads)]}</b></p><ul>")
+        for _ in range(items):
+            parts.append("<li>" + " ".join(rnd.choice(words) for _ in range(rnd.randint(4, 14))) + "</li>")
+        parts.append("</ul>")
+        parts.append("<p>" + "<br>".join("• " + " ".join(rnd.choice(words) for _ in range(6)) for _ in range(5)) + "</p>")
+    if pathological:
+        # незакриті теги, тисячі <b> без заголовків, глибока вкладеність і довжелезний рядок
+        parts.append("<p>" + "".join(f"<b>{rnd.choice(words)}" for _ in range(1500)) + "</p>")
+        parts.append(_nest("<p>глибоко вкладений абзац " + "x" * 20000 + "</p>", 220, "nest"))
+        parts.append("<ul>" + "".join(f"<li>{rnd.choice(words)}" for _ in range(2000)))
+    desc = "\n".join(parts)
+    return f'''<!DOCTYPE html>
+<html lang="uk">
+<head>
+<meta charset="utf-8">
+<title>Вакансія: Python Developer, SoftServe, Львів — Work.ua</title>
+<meta property="og:description" content="Вакансія Python Developer у компанія SoftServe, Львів. Зарплата 50 000 – 70 000 грн. Повна зайнятість.">{_JOB_LD if jsonld else ""}
+</head>
+<body>
+<main class="container"><div class="row"><div class="col-md-8">
+<div class="card wordwrap" id="job-card">
+  <div class="mb-sm"><span class="text-default-7">Вакансія від <time datetime="2025-10-01 09:15:00">1 жовтня 2025</time></span></div>
+  <h1 id="h1-name" class="my-0">Python Developer</h1>
+  <ul class="list-unstyled">
+    <li title="Зарплата"><span class="strong-500">50&nbsp;000&nbsp;–&nbsp;70&nbsp;000 грн</span></li>
+    <li title="Дані про компанію"><a href="/company/softserve/"><span class="strong-500">SoftServe</span></a></li>
+    <li title="Умови й вимоги">Повна зайнятість. Дистанційна робота.<br>Досвід роботи від 2 років.</li>
+  </ul>
+  <div id="job-description">
+{desc}
+  </div>
+</div>
+</div></div></main>
+</body>
+</html>
+'''
+
+
+FIXTURES = {
+    "search_python.html": lambda: search_page(40, 18),
+    "search_large.html": lambda: search_page(300, 18, seed=8),
+    "search_pathological.html": lambda: search_page(40, 150, seed=9, wrapper_cls="card-wrap"),
+    "job_large.html": lambda: job_page(40, 30),
+    "job_pathological.html": lambda: job_page(5, 10, pathological=True),
+    "job_jsonld.html": lambda: job_page(6, 8, jsonld=True),
+}
+
+
+if __name__ == "__main__":
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name, build in FIXTURES.items():
+        path = os.path.join(FIXTURES_DIR, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(build())
+        print(name, os.path.getsize(path))
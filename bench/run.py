@@ -0,0 +1,252 @@
+"""Офлайн-бенчмарк скрапера проти локальної заглушки work.ua.
+
+    python bench/run.py [--backends http,selenium] [--parsers lxml,reference]
+                        [--requests 30] [--concurrency 8] [--latency 0.05] [--jitter 0.02]
+                        [--search search_large.html] [--job job_large.html] [--out result.json]
+
+Проганяє sync і async шляхи (search_workua_detailed, scrape_workua_job) для кожної
+пари бекенд × парсер, окремо міряє кожен _extract_* на готовому soup і друкує JSON:
+пропускна здатність, p50/p95/p99, пік RSS і пік кількості процесів Chrome.
+Мемо розбору async-рушія вимкнено (SCRAPER_PARSE_MEMO_SIZE=0, якщо не задано інше);
+parses/parse_memo_hits у кожному async-прогоні показують, скільки разів справді парсили.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import resource
+import threading
+import statistics
+
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server import start_server, _read_fixture
+
+SRV = None
+
+
+def _setup(a: argparse.Namespace):
+    """Сервер піднімається до імпорту скрапера: WORKUA_BASE_URL читається при імпорті."""
+    global SRV
+    SRV = start_server(a.search, a.job, 0, a.latency, a.jitter)
+    os.environ["WORKUA_BASE_URL"] = SRV.base_url
+    os.environ.setdefault("SCRAPER_PROXIES_FILE", os.devnull)
+    os.environ.setdefault("SCRAPER_POLITE_DELAY", "0")
+    os.environ.setdefault("SCRAPER_POLITE_JITTER", "0")
+    # async.job тягне ту саму сторінку --requests разів: з мемо парсинг міряли б лише раз
+    os.environ.setdefault("SCRAPER_PARSE_MEMO_SIZE", "0")
+    import scraper_workua
+    import scraper_async
+    return scraper_workua, scraper_async
+
+
+def _chrome_count() -> int:
+    n = 0
+    for pid in os.listdir("/proc") if os.path.isdir("/proc") else ():
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/comm", "r") as f:
+                name = f.read().strip().lower()
+        except OSError:
+            continue
+        if "chrome" in name:
+            n += 1
+    return n
+
+
+class _Sampler:
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak_chrome = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_chrome = max(self.peak_chrome, _chrome_count())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _peak_rss_mb() -> float:
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    kb += resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(kb / 1024, 1)
+
+
+def _pct(xs: List[float], q: float) -> Optional[float]:
+    if not xs:
+        return None
+    xs = sorted(xs)
+    return round(xs[min(len(xs) - 1, int(q * len(xs)))] * 1000, 2)
+
+
+def _summary(lat: List[float], wall: float, errors: int, items: int) -> Dict:
+    return {
+        "requests": len(lat) + errors,
+        "errors": errors,
+        "items": items,
+        "wall_s": round(wall, 3),
+        "rps": round(len(lat) / wall, 2) if wall else None,
+        "p50_ms": _pct(lat, 0.50),
+        "p95_ms": _pct(lat, 0.95),
+        "p99_ms": _pct(lat, 0.99),
+        "mean_ms": round(statistics.fmean(lat) * 1000, 2) if lat else None,
+    }
+
+
+def _run_sync(fn: Callable[[], object], n: int) -> Dict:
+    lat: List[float] = []
+    errors = items = 0
+    t0 = time.perf_counter()
+    for _ in range(n):
+        t = time.perf_counter()
+        try:
+            res = fn()
+        except Exception as e:
+            errors += 1
+            print("[BENCH] sync error:", e, file=sys.stderr)
+            continue
+        lat.append(time.perf_counter() - t)
+        items += len(res) if isinstance(res, list) else 1
+    return _summary(lat, time.perf_counter() - t0, errors, items)
+
+
+async def _run_async(fn: Callable[[], object], n: int, concurrency: int) -> Dict:
+    lat: List[float] = []
+    errors = items = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors, items
+        async with sem:
+            t = time.perf_counter()
+            try:
+                res = await fn()
+            except Exception as e:
+                errors += 1
+                print("[BENCH] async error:", e, file=sys.stderr)
+                return
+            lat.append(time.perf_counter() - t)
+            items += len(res) if isinstance(res, list) else 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n)))
+    return _summary(lat, time.perf_counter() - t0, errors, items)
+
+
+def _bench_extractors(sw, html: str, rounds: int) -> Dict[str, float]:
+    """CPU на виклик кожного кроку старого екстрактора, soup парситься один раз."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    page_text = sw._clean(soup.get_text(" "))
+    steps = {
+        "_extract_company": lambda: sw._extract_company(soup, page_text),
+        "_extract_salary": lambda: sw._extract_salary(soup, page_text),
+        "_extract_posted": lambda: sw._extract_posted(soup, page_text),
+        "_extract_employment": lambda: sw._extract_employment(soup, page_text),
+        "_extract_section_items[tasks]": lambda: sw._extract_section_items(soup, "tasks"),
+        "_extract_section_items[expect]": lambda: sw._extract_section_items(soup, "expect"),
+    }
+    out = {}
+    for name, fn in steps.items():
+        t = time.process_time()
+        for _ in range(rounds):
+            fn()
+        out[name] = round((time.process_time() - t) / rounds * 1000, 3)
+    return out
+
+
+def _selenium_available() -> bool:
+    return bool(shutil.which("chromedriver") or shutil.which("google-chrome") or shutil.which("chromium"))
+
+
+def main(argv: Optional[list] = None) -> Dict:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backends", default="http,selenium")
+    ap.add_argument("--parsers", default="lxml,reference")
+    ap.add_argument("--requests", type=int, default=30)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--search", default="search_python.html")
+    ap.add_argument("--job", default="job_python.html")
+    ap.add_argument("--query", default="python")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--rounds", type=int, default=20, help="повторів для мікробенчу _extract_*")
+    ap.add_argument("--out")
+    a = ap.parse_args(argv)
+
+    sw, sa = _setup(a)
+    job_url = f"{SRV.base_url}/jobs/7200000/"
+    report = {
+        "server": {"latency": a.latency, "jitter": a.jitter, "search": a.search, "job": a.job},
+        "runs": [],
+        "skipped": [],
+    }
+
+    with _Sampler() as sampler:
+        for backend in [b.strip() for b in a.backends.split(",") if b.strip()]:
+            if backend in ("selenium", "auto") and not _selenium_available():
+                report["skipped"].append({"backend": backend, "reason": "chrome/chromedriver not found"})
+                continue
+            for parser in [p.strip() for p in a.parsers.split(",") if p.strip()]:
+                sw.SEARCH_PARSER = sw.JOB_PARSER = parser
+                cases = {
+                    "sync.search": lambda: sw.search_workua_detailed(a.query, a.limit, backend=backend),
+                    "sync.job": lambda: sw.scrape_workua_job(job_url, backend=backend),
+                }
+                for name, fn in cases.items():
+                    report["runs"].append({"case": name, "backend": backend, "parser": parser,
+                                           **_run_sync(fn, a.requests)})
+
+                async def run_async():
+                    out = []
+                    for name, fn in {
+                        "async.search": lambda: sa.search_workua_detailed_async(a.query, a.limit, backend=backend),
+                        "async.job": lambda: sa.scrape_workua_job_async(job_url, backend=backend),
+                    }.items():
+                        engine = sa.get_engine()
+                        before = dict(engine.stats)
+                        res = await _run_async(fn, a.requests, a.concurrency)
+                        memo = {k: v - before[k] for k, v in engine.stats.items()}
+                        out.append({"case": name, "backend": backend, "parser": parser, **res, **memo})
+                    await sa.close_engine()
+                    return out
+
+                report["runs"].extend(asyncio.run(run_async()))
+
+    report["extract_cpu_ms"] = _bench_extractors(sw, _read_fixture(a.job), a.rounds)
+    report["server_hits"] = dict(SRV.hits)
+    report["peak_rss_mb"] = _peak_rss_mb()
+    report["peak_chrome_procs"] = sampler.peak_chrome
+    report["driver_pool"] = sw.DRIVER_POOL.stats()
+    report["selenium_traffic"] = {**sw.SELENIUM_TRAFFIC, "lean": sw.LEAN_PROFILE}
+    SRV.shutdown()
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if a.out:
+        with open(a.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Регресія парсера видачі: той самий результат, що й у старого, і час CPU.
+
+    python bench/search_parser.py [fixture.html ...]
+
+На search_pathological.html старий парсер помиляється навмисно: зовнішні обгортки
+class="card-wrap-N" він бере за картки і повертає дублікати. Там очікуваний результат —
+старий парсер на тій самій розмітці без цих обгорток, а id мають збігатися з його
+видачею після дедуплікації за URL.
+"""
+import os
+import re
+import sys
+import time
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper_workua import parse_search_results, _parse_search_results_reference
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+_CARD_WRAP_RE = re.compile(r'class="card-wrap-')
+
+
+def _cpu_per_call(fn, html: str, rounds: int) -> float:
+    t = time.process_time()
+    for _ in range(rounds):
+        fn(html, 1000)
+    return (time.process_time() - t) / rounds
+
+
+def check(path: str, rounds: int = 20) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    new = parse_search_results(html, 1000)
+    old = _parse_search_results_reference(html, 1000)
+    wrapped = bool(_CARD_WRAP_RE.search(html))
+    expected = _parse_search_results_reference(_CARD_WRAP_RE.sub('class="wrap-', html), 1000) if wrapped else old
+    urls = [r["url"] for r in new]
+    t_new = _cpu_per_call(parse_search_results, html, rounds)
+    t_old = _cpu_per_call(_parse_search_results_reference, html, rounds)
+    return {
+        "fixture": os.path.basename(path),
+        "cards": len(new),
+        "reference_cards": len(old),
+        "unique_ids": len(set(urls)) == len(urls),
+        "ids_match_reference": urls == list(dict.fromkeys(r["url"] for r in old)),
+        "same_output": new == expected,
+        "cpu_ms_reference": round(t_old * 1000, 3),
+        "cpu_ms_lxml": round(t_new * 1000, 3),
+        "speedup": round(t_old / t_new, 1) if t_new else None,
+    }
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or [os.path.join(FIXTURES_DIR, "search_python.html")]
+    results = [check(p) for p in paths]
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    sys.exit(0 if all(r["same_output"] and r["unique_ids"] and r["ids_match_reference"] for r in results) else 1)
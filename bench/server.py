@@ -0,0 +1,104 @@
+"""Локальна заглушка work.ua для бенчмарків: віддає фікстури з bench/fixtures.
+
+    python bench/server.py [--port 8765] [--latency 0.05] [--jitter 0.02]
+                           [--search search_python.html] [--job job_python.html]
+
+/jobs-<slug>/ і /jobs/?search=... -> фікстура видачі, /jobs/<id>/ -> фікстура вакансії.
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+_JOB_PATH_RE = re.compile(r"^/jobs/\d+/?$")
+_SEARCH_PATH_RE = re.compile(r"^/jobs(-[^/?]+)?/?$")
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, search_html: str, job_html: str, latency: float = 0.0, jitter: float = 0.0):
+        super().__init__(addr, _Handler)
+        self.search_body = search_html.encode("utf-8")
+        self.job_body = job_html.encode("utf-8")
+        self.latency = latency
+        self.jitter = jitter
+        self.hits = {"search": 0, "job": 0, "missing": 0}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FixtureServer
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if _JOB_PATH_RE.match(path):
+            kind, body = "job", self.server.job_body
+        elif _SEARCH_PATH_RE.match(path):
+            kind, body = "search", self.server.search_body
+        else:
+            kind, body = "missing", b"<html><body>not found</body></html>"
+        self.server.hits[kind] += 1
+        delay = self.server.latency + random.uniform(0, self.server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        self.send_response(404 if kind == "missing" else 200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _read_fixture(name: str) -> str:
+    path = name if os.path.isabs(name) else os.path.join(FIXTURES_DIR, name)
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def start_server(
+    search: str = "search_python.html",
+    job: str = "job_python.html",
+    port: int = 0,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+) -> FixtureServer:
+    """Запускає сервер у фоновому потоці; port=0 — будь-який вільний."""
+    srv = FixtureServer(("127.0.0.1", port), _read_fixture(search), _read_fixture(job), latency, jitter)
+    threading.Thread(target=srv.serve_forever, name="bench-server", daemon=True).start()
+    return srv
+
+
+def _args(argv: Optional[list] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="затримка відповіді, с")
+    ap.add_argument("--jitter", type=float, default=0.0, help="випадкова добавка до затримки, с")
+    ap.add_argument("--search", default="search_python.html")
+    ap.add_argument("--job", default="job_python.html")
+    return ap.parse_args(argv)
+
+
+if __name__ == "__main__":
+    a = _args()
+    srv = start_server(a.search, a.job, a.port, a.latency, a.jitter)
+    print(f"[BENCH] serving fixtures on {srv.base_url}", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.shutdown()
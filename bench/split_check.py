@@ -0,0 +1,46 @@
+"""Перевірка sender.split_html: кожна частина ≤ 4096 одиниць UTF-16, теги збалансовані,
+текст не губиться — зокрема для астральних символів (емодзі займають 2 одиниці).
+
+    python bench/split_check.py
+"""
+import os
+import re
+import sys
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sender import TELEGRAM_TEXT_LIMIT, _open_tags, _tg_len, split_html
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+CASES = {
+    "astral_no_spaces": "😀" * 5000,
+    "astral_words": " ".join(["😀🚀"] * 3000),
+    "mixed_bmp_astral": ("Вакансія 😀 " * 800) + "\n\n" + ("𝔘𝔫𝔦𝔠𝔬𝔡𝔢 " * 900),
+    "html_tags": "\n".join(f"<b>Рядок {i}</b> <a href='https://x/{i}'>посилання 😀</a>" for i in range(600)),
+    "long_bold_paragraph": "<b>" + ("жирний 🚀 текст " * 700) + "</b>",
+}
+
+
+def check(name: str, text: str) -> dict:
+    chunks = split_html(text)
+    sizes = [_tg_len(c) for c in chunks]
+    unbalanced = [i for i, c in enumerate(chunks) if _open_tags(c, [])]
+    plain = lambda s: re.sub(r"\s+", "", _TAG_RE.sub("", s))  # noqa: E731
+    res = {
+        "case": name,
+        "chunks": len(chunks),
+        "max_utf16": max(sizes),
+        "over_limit": [i for i, n in enumerate(sizes) if n > TELEGRAM_TEXT_LIMIT],
+        "unbalanced": unbalanced,
+        "text_preserved": plain("".join(chunks)) == plain(text),
+    }
+    res["ok"] = not res["over_limit"] and not unbalanced and res["text_preserved"]
+    return res
+
+
+if __name__ == "__main__":
+    results = [check(n, t) for n, t in CASES.items()]
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    sys.exit(0 if all(r["ok"] for r in results) else 1)
@@ -0,0 +1,208 @@
+"""Масовий експорт вакансій у JSONL.
+
+    python bulk.py urls.txt -o jobs.jsonl -w 4
+    cat queries.txt | python bulk.py - --mode query --details -o jobs.jsonl
+    python bulk.py urls.txt -o jobs.jsonl --resume      # продовжити після переривання
+
+Рядок входу — URL вакансії або пошуковий запит (--mode auto розрізняє за http).
+Результати пишуться потоково, по рядку на вакансію; виконані входи дописуються
+у checkpoint (<out>.ckpt), тож --resume пропускає вже зроблене.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from multiprocessing.util import Finalize
+from typing import Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+
+def _init_worker(pool_size: int) -> None:
+    # у кожному процесі свій пул браузерів; --browsers-per-worker важливіший за env
+    os.environ["SCRAPER_POOL_SIZE"] = str(pool_size)
+    # діагностичні print скрапера не повинні потрапити в JSONL, коли він іде в stdout
+    sys.stdout = sys.stderr
+    from scraper_workua import DRIVER_POOL
+
+    # atexit у дочірніх процесах multiprocessing не спрацьовує — Chrome закриваємо явно
+    Finalize(None, DRIVER_POOL.close, exitpriority=10)
+
+
+def _work(kind: str, item: str, backend: Optional[str], limit: int, details: bool) -> List[Dict]:
+    from scraper_workua import scrape_workua_job, search_workua_detailed
+
+    if kind == "url":
+        return [scrape_workua_job(item, backend=backend)]
+    rows = search_workua_detailed(item, limit=limit, backend=backend)
+    if not details:
+        return [{**r, "query": item} for r in rows]
+    out = []
+    for r in rows:
+        try:
+            out.append({**scrape_workua_job(r["url"], backend=backend), "query": item})
+        except Exception as e:
+            out.append({**r, "query": item, "error": repr(e)})
+    return out
+
+
+def _read_inputs(src: TextIO, mode: str) -> Iterator[Tuple[str, str]]:
+    for line in src:
+        item = line.strip()
+        if not item or item.startswith("#"):
+            continue
+        kind = mode if mode != "auto" else ("url" if item.lower().startswith("http") else "query")
+        yield kind, item
+
+
+def _key(kind: str, item: str) -> str:
+    return f"{kind}:{item}"
+
+
+def _drop_partial_line(path: str) -> None:
+    """Обрізає недописаний останній рядок JSONL (процес убили посеред write)."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if not size:
+            return
+        pos = size
+        while pos > 0:
+            step = min(65536, pos)
+            f.seek(pos - step)
+            nl = f.read(step).rfind(b"\n")
+            if nl != -1:
+                pos = pos - step + nl + 1
+                break
+            pos -= step
+        if pos != size:
+            f.truncate(pos)
+            print(f"[BULK] dropped partial last line ({size - pos} bytes)", file=sys.stderr)
+
+
+def _load_checkpoint(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+class Progress:
+    def __init__(self, every: float = 5.0, stream: TextIO = sys.stderr):
+        self.every = every
+        self.stream = stream
+        self.started = time.monotonic()
+        self._last = self.started
+        self.done = self.skipped = self.errors = self.records = 0
+
+    def tick(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last < self.every:
+            return
+        self._last = now
+        elapsed = now - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        print(f"[BULK] done={self.done} records={self.records} errors={self.errors} "
+              f"skipped={self.skipped} {rate:.2f} inputs/s", file=self.stream, flush=True)
+
+    def summary(self) -> Dict:
+        elapsed = time.monotonic() - self.started
+        return {
+            "inputs_done": self.done,
+            "records": self.records,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "elapsed_s": round(elapsed, 1),
+            "inputs_per_s": round(self.done / elapsed, 3) if elapsed else None,
+            "records_per_s": round(self.records / elapsed, 3) if elapsed else None,
+        }
+
+
+def run(a: argparse.Namespace) -> Dict:
+    ckpt_path = a.checkpoint or (a.out + ".ckpt" if a.out else None)
+    if a.resume and not ckpt_path:
+        raise SystemExit("--resume потребує --out або --checkpoint")
+    if a.resume:
+        for path in (a.out, ckpt_path):
+            if path:
+                _drop_partial_line(path)
+    done_keys = _load_checkpoint(ckpt_path) if a.resume and ckpt_path else set()
+
+    src = sys.stdin if a.input == "-" else open(a.input, "r", encoding="utf-8")
+    out = open(a.out, "a" if a.resume else "w", encoding="utf-8") if a.out else sys.stdout
+    ckpt = open(ckpt_path, "a" if a.resume else "w", encoding="utf-8") if ckpt_path else None
+    progress = Progress(a.progress_every)
+    window = max(1, a.workers) * 4  # скільки входів тримаємо в польоті — пам'ять не росте з розміром входу
+    pending: Dict[Future, Tuple[str, str]] = {}
+
+    def drain() -> None:
+        if not pending:
+            return
+        finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        for fut in finished:
+            kind, item = pending.pop(fut)
+            try:
+                rows = fut.result()
+            except Exception as e:
+                progress.errors += 1
+                print(json.dumps({"input": item, "error": repr(e)}, ensure_ascii=False), file=sys.stderr)
+                continue
+            for row in rows:
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            out.flush()
+            if ckpt is not None:
+                ckpt.write(_key(kind, item) + "\n")
+                ckpt.flush()
+            progress.done += 1
+            progress.records += len(rows)
+        progress.tick()
+
+    pool = ProcessPoolExecutor(max_workers=max(1, a.workers), initializer=_init_worker,
+                               initargs=(a.browsers_per_worker,))
+    interrupted = False
+    try:
+        for kind, item in _read_inputs(src, a.mode):
+            if _key(kind, item) in done_keys:
+                progress.skipped += 1
+                continue
+            while len(pending) >= window:
+                drain()
+            pending[pool.submit(_work, kind, item, a.backend, a.limit, a.details)] = (kind, item)
+        while pending:
+            drain()
+    except KeyboardInterrupt:
+        interrupted = True
+        print("[BULK] interrupted, checkpoint saved", file=sys.stderr)
+    finally:
+        pool.shutdown(wait=not interrupted, cancel_futures=True)
+        for f in (src, out, ckpt):
+            if f not in (None, sys.stdin, sys.stdout):
+                f.close()
+    progress.tick(force=True)
+    summary = {**progress.summary(), "interrupted": interrupted}
+    print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+    return summary
+
+
+def _args(argv: Optional[list] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("input", help="файл з URL/запитами або - для stdin")
+    ap.add_argument("-o", "--out", help="JSONL-файл (за замовчуванням stdout)")
+    ap.add_argument("--mode", choices=("auto", "url", "query"), default="auto")
+    ap.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 2, help="кількість процесів")
+    ap.add_argument("--browsers-per-worker", type=int, default=1)
+    ap.add_argument("--backend", choices=("auto", "http", "selenium"))
+    ap.add_argument("--limit", type=int, default=20, help="вакансій на запит")
+    ap.add_argument("--details", action="store_true", help="для запитів тягнути ще й деталі кожної вакансії")
+    ap.add_argument("--checkpoint", help="файл checkpoint (за замовчуванням <out>.ckpt)")
+    ap.add_argument("--resume", action="store_true", help="пропустити входи з checkpoint і дописувати в out")
+    ap.add_argument("--progress-every", type=float, default=5.0, help="секунд між рядками прогресу")
+    return ap.parse_args(argv)
+
+
+if __name__ == "__main__":
+    s = run(_args())
+    sys.exit(130 if s["interrupted"] else (1 if s["errors"] and not s["inputs_done"] else 0))
@@ -0,0 +1,425 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from metrics import log
+
+
+class JobCache:
+    """TTL/LRU-кеш деталей вакансій за id Work.ua.
+
+    Запис свіжий `ttl` секунд, після цього ще `stale_ttl` секунд його можна
+    віддавати як застарілий (stale-while-revalidate). Пам'ять обмежена
+    `max_items` записами; опційний SQLite-рівень переживає перезапуск і
+    працює в потоках, щоб SELECT і commit не блокували цикл подій.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 600.0,
+        stale_ttl: float = 3600.0,
+        max_items: int = 2000,
+        db_path: Optional[str] = None,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_items = max(1, max_items)
+        self._mem: "OrderedDict[int, Tuple[float, Dict]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._puts = 0
+        self._revalidating: Dict[int, asyncio.Task] = {}
+        self.stats = {"hits": 0, "stale_hits": 0, "disk_hits": 0, "misses": 0, "bypass": 0}
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY, stored_at REAL, data TEXT)"
+            )
+            self._db.commit()
+
+    def _max_age(self) -> float:
+        return self.ttl + self.stale_ttl
+
+    def _remember(self, job_id: int, stored_at: float, job: Dict) -> None:
+        self._mem[job_id] = (stored_at, job)
+        self._mem.move_to_end(job_id)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+
+    def _load_db(self, job_id: int) -> Optional[Tuple[float, Dict]]:
+        with self._db_lock:
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT stored_at, data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _store_db(self, job_id: int, now: float, data: str) -> None:
+        with self._db_lock:
+            if self._db is None:
+                return
+            self._db.execute("INSERT OR REPLACE INTO jobs (id, stored_at, data) VALUES (?, ?, ?)", (job_id, now, data))
+            self._puts += 1
+            if self._puts % 100 == 0:
+                self._db.execute("DELETE FROM jobs WHERE stored_at < ?", (now - self._max_age(),))
+            self._db.commit()
+
+    def _delete_db(self, job_id: int) -> None:
+        with self._db_lock:
+            if self._db is None:
+                return
+            self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            self._db.commit()
+
+    async def _entry(self, job_id: int) -> Optional[Tuple[float, Dict]]:
+        entry = self._mem.get(job_id)
+        if entry is not None or self._db is None:
+            return entry
+        entry = await asyncio.to_thread(self._load_db, job_id)
+        if entry is not None and job_id not in self._mem:  # поки читали диск, могли покласти свіже
+            self.stats["disk_hits"] += 1
+            self._remember(job_id, *entry)
+        return self._mem.get(job_id, entry)
+
+    async def get(self, job_id: int) -> Tuple[Optional[Dict], bool]:
+        """(job, fresh); job=None, якщо запису немає або він прострочений повністю."""
+        entry = await self._entry(job_id)
+        if entry is not None and job_id in self._mem:
+            self._mem.move_to_end(job_id)
+        now = time.time()
+        if entry is None or now - entry[0] > self._max_age():
+            self.stats["misses"] += 1
+            return None, False
+        fresh = now - entry[0] <= self.ttl
+        self.stats["hits" if fresh else "stale_hits"] += 1
+        return entry[1], fresh
+
+    async def peek(self, job_id: int) -> bool:
+        """Чи є свіжий запис — без оновлення LRU-порядку та лічильників."""
+        entry = self._mem.get(job_id)
+        if entry is None and self._db is not None:
+            entry = await asyncio.to_thread(self._load_db, job_id)
+        return entry is not None and time.time() - entry[0] <= self.ttl
+
+    async def put(self, job_id: int, job: Dict) -> None:
+        now = time.time()
+        self._remember(job_id, now, job)
+        if self._db is not None:
+            await asyncio.to_thread(self._store_db, job_id, now, json.dumps(job, ensure_ascii=False))
+
+    async def invalidate(self, job_id: int) -> None:
+        self._mem.pop(job_id, None)
+        if self._db is not None:
+            await asyncio.to_thread(self._delete_db, job_id)
+
+    def _revalidate(self, job_id: int, fetch: Callable[[], Awaitable[Dict]]) -> None:
+        if job_id in self._revalidating:
+            return
+
+        async def run():
+            try:
+                await self.put(job_id, await fetch())
+            except Exception as e:
+                log("cache_revalidate_error", level="warning", job_id=job_id, error=repr(e))
+            finally:
+                self._revalidating.pop(job_id, None)
+
+        self._revalidating[job_id] = asyncio.get_running_loop().create_task(run())
+
+    async def aget_or_fetch(
+        self,
+        job_id: Optional[int],
+        fetch: Callable[[], Awaitable[Dict]],
+        bypass: bool = False,
+    ) -> Dict:
+        """Свіжий запис — одразу; застарілий — одразу + фонове оновлення;
+        bypass=True завжди тягне сторінку і оновлює кеш."""
+        if job_id is None:
+            return await fetch()
+        if bypass:
+            self.stats["bypass"] += 1
+        else:
+            job, fresh = await self.get(job_id)
+            if job is not None:
+                if not fresh:
+                    self._revalidate(job_id, fetch)
+                return job
+        job = await fetch()
+        await self.put(job_id, job)
+        return job
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class SingleFlight:
+    """Об'єднує одночасні виклики з однаковим ключем в один запит."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+
+            def _done(t: asyncio.Task) -> None:
+                if self._inflight.get(key) is t:
+                    del self._inflight[key]
+
+            task.add_done_callback(_done)
+        else:
+            self.coalesced += 1
+        # shield: скасування одного з очікувачів не зупиняє спільний запит
+        return await asyncio.shield(task)
+
+
+class SearchCache:
+    """Короткоживучий кеш результатів пошуку з single-flight для однакових запитів."""
+
+    def __init__(self, ttl: float = 120.0, max_items: int = 500):
+        self.ttl = ttl
+        self.max_items = max(1, max_items)
+        self._mem: "OrderedDict[str, Tuple[float, List[Dict]]]" = OrderedDict()
+        self._flight = SingleFlight()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        entry = self._mem.get(key)
+        if entry is None or time.time() - entry[0] > self.ttl:
+            self._mem.pop(key, None)
+            self.stats["misses"] += 1
+            return None
+        self._mem.move_to_end(key)
+        self.stats["hits"] += 1
+        return list(entry[1])
+
+    def put(self, key: str, rows: List[Dict]) -> None:
+        self._mem[key] = (time.time(), list(rows))
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+
+    async def aget_or_fetch(self, key: str, fetch: Callable[[], Awaitable[List[Dict]]]) -> List[Dict]:
+        rows = self.get(key)
+        if rows is not None:
+            return rows
+
+        async def run() -> List[Dict]:
+            found = await fetch()
+            if found:
+                self.put(key, found)
+            return found
+
+        return list(await self._flight.do(key, run))
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            "coalesced": self._flight.coalesced,
+            "fetches": self._flight.leaders,
+            "size": len(self._mem),
+        }
+
+
+class JobRow:
+    """Компактний рядок видачі: slots замість dict, повторювані рядки інтерновані."""
+
+    FIELDS = ("url", "title", "company", "salary", "employment")
+    __slots__ = FIELDS
+
+    def __init__(self, url: str, title: str, company: str, salary: str, employment: str):
+        self.url = url
+        self.title = title
+        self.company = sys.intern(company)
+        self.salary = sys.intern(salary)
+        self.employment = sys.intern(employment)
+
+    @classmethod
+    def from_dict(cls, row: Dict) -> "JobRow":
+        return cls(*(str(row.get(f) or "—") for f in cls.FIELDS))
+
+    def as_dict(self) -> Dict[str, str]:
+        return {f: getattr(self, f) for f in self.FIELDS}
+
+    def as_list(self) -> List[str]:
+        return [getattr(self, f) for f in self.FIELDS]
+
+
+class ResultStore:
+    """Останній список результатів пошуку на користувача (для кнопок "open:N").
+
+    У пам'яті — TTL + LRU на `max_users` користувачів; опційно SQLite (переживає
+    перезапуск) або Redis (спільний для кількох реплік бота). З Redis локальний рівень
+    не використовується: інша репліка могла вже замінити список, і "open:N" відкрив би
+    не ту вакансію.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 86400.0,
+        max_users: int = 10000,
+        db_path: Optional[str] = None,
+        redis_url: Optional[str] = None,
+    ):
+        self.ttl = ttl
+        self.max_users = max(1, max_users)
+        self._mem: "OrderedDict[int, Tuple[float, Tuple[JobRow, ...]]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._redis = None
+        self._puts = 0
+        self.stats = {"hits": 0, "backend_hits": 0, "misses": 0, "expired": 0}
+        if redis_url:
+            import redis.asyncio as aioredis  # опційна залежність, лише з REDIS_URL
+
+            self._redis = aioredis.from_url(redis_url)
+        elif db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (user_id INTEGER PRIMARY KEY, stored_at REAL, data TEXT)"
+            )
+            self._db.commit()
+
+    def _remember(self, user_id: int, stored_at: float, rows: Tuple[JobRow, ...]) -> None:
+        self._mem[user_id] = (stored_at, rows)
+        self._mem.move_to_end(user_id)
+        while len(self._mem) > self.max_users:
+            self._mem.popitem(last=False)
+
+    @staticmethod
+    def _encode(rows: Tuple[JobRow, ...]) -> str:
+        return json.dumps([r.as_list() for r in rows], ensure_ascii=False)
+
+    @staticmethod
+    def _decode(data) -> Tuple[JobRow, ...]:
+        return tuple(JobRow(*r) for r in json.loads(data))
+
+    def _load_db(self, user_id: int) -> Optional[Tuple[float, Tuple[JobRow, ...]]]:
+        with self._db_lock:
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT stored_at, data FROM results WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return (row[0], self._decode(row[1])) if row else None
+
+    def _store_db(self, user_id: int, now: float, data: str) -> None:
+        with self._db_lock:
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (user_id, stored_at, data) VALUES (?, ?, ?)",
+                (user_id, now, data),
+            )
+            self._puts += 1
+            if self._puts % 100 == 0:
+                self._db.execute("DELETE FROM results WHERE stored_at < ?", (now - self.ttl,))
+            self._db.commit()
+
+    async def _load(self, user_id: int) -> Optional[Tuple[float, Tuple[JobRow, ...]]]:
+        if self._redis is not None:
+            raw = await self._redis.get(f"results:{user_id}")
+            if raw is None:
+                return None
+            stored_at, data = json.loads(raw)
+            return stored_at, tuple(JobRow(*r) for r in data)
+        if self._db is not None:
+            return await asyncio.to_thread(self._load_db, user_id)
+        return None
+
+    async def get(self, user_id: int) -> List[Dict]:
+        now = time.time()
+        if self._redis is not None:
+            # Redis — єдине джерело правди для всіх реплік
+            entry = await self._load(user_id)
+            if entry is None:
+                self.stats["misses"] += 1
+                return []
+            if now - entry[0] > self.ttl:
+                self.stats["expired"] += 1
+                return []
+            self.stats["backend_hits"] += 1
+            return [r.as_dict() for r in entry[1]]
+        entry = self._mem.get(user_id)
+        if entry is None:
+            entry = await self._load(user_id)
+            if entry is not None:
+                self.stats["backend_hits"] += 1
+                self._remember(user_id, *entry)
+        else:
+            self._mem.move_to_end(user_id)
+        if entry is None:
+            self.stats["misses"] += 1
+            return []
+        if now - entry[0] > self.ttl:
+            self.stats["expired"] += 1
+            self._mem.pop(user_id, None)
+            return []
+        self.stats["hits"] += 1
+        return [r.as_dict() for r in entry[1]]
+
+    async def put(self, user_id: int, rows: List[Dict]) -> None:
+        now = time.time()
+        packed = tuple(JobRow.from_dict(r) for r in rows)
+        if self._redis is not None:
+            payload = json.dumps([now, [r.as_list() for r in packed]], ensure_ascii=False)
+            await self._redis.set(f"results:{user_id}", payload, ex=max(1, int(self.ttl)))
+            return
+        self._remember(user_id, now, packed)
+        if self._db is not None:
+            await asyncio.to_thread(self._store_db, user_id, now, self._encode(packed))
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "users": len(self._mem)}
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def job_cache_from_env() -> JobCache:
+    return JobCache(
+        ttl=float(os.getenv("DETAIL_CACHE_TTL", "600")),
+        stale_ttl=float(os.getenv("DETAIL_CACHE_STALE_TTL", "3600")),
+        max_items=int(os.getenv("DETAIL_CACHE_SIZE", "2000")),
+        db_path=os.getenv("DETAIL_CACHE_DB", "").strip() or None,
+    )
+
+def search_cache_from_env() -> SearchCache:
+    return SearchCache(
+        ttl=float(os.getenv("SEARCH_CACHE_TTL", "120")),
+        max_items=int(os.getenv("SEARCH_CACHE_SIZE", "500")),
+    )
+
+def result_store_from_env() -> ResultStore:
+    return ResultStore(
+        ttl=float(os.getenv("RESULTS_TTL", "86400")),
+        max_users=int(os.getenv("RESULTS_MAX_USERS", "10000")),
+        db_path=os.getenv("RESULTS_DB", "").strip() or None,
+        redis_url=os.getenv("REDIS_URL", "").strip() or None,
+    )
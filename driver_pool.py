@@ -0,0 +1,177 @@
+import os
+import time
+import atexit
+import threading
+
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from metrics import span
+
+
+class PoolTimeout(TimeoutError):
+    pass
+
+
+class PooledDriver:
+    __slots__ = ("driver", "proxy", "created", "last_used", "pages")
+
+    def __init__(self, driver, proxy: Optional[str]):
+        self.driver = driver
+        self.proxy = proxy
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.pages = 0
+
+
+class DriverPool:
+    """Пул довгоживучих Chrome-драйверів з checkout/checkin.
+
+    Кожен драйвер має власну ідентичність (проксі + UA, обраний під час
+    створення) і перевикористовується лише для того самого проксі.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[Optional[str]], object],
+        size: int = 2,
+        max_pages: int = 50,
+        max_age: float = 600.0,
+        acquire_timeout: float = 60.0,
+    ):
+        self._factory = factory
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_age = max_age
+        self.acquire_timeout = acquire_timeout
+        self._idle: List[PooledDriver] = []
+        self._busy = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self.created = 0
+        self.recycled = 0
+
+    def _expired(self, pd: PooledDriver) -> bool:
+        if self.max_pages and pd.pages >= self.max_pages:
+            return True
+        return bool(self.max_age) and time.monotonic() - pd.created >= self.max_age
+
+    @staticmethod
+    def _healthy(pd: PooledDriver) -> bool:
+        try:
+            pd.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(pd: PooledDriver) -> None:
+        try:
+            pd.driver.quit()
+        except Exception:
+            pass
+
+    def _take_idle(self, proxy: Optional[str]) -> Optional[PooledDriver]:
+        for i in range(len(self._idle) - 1, -1, -1):
+            if self._idle[i].proxy == proxy:
+                return self._idle.pop(i)
+        return None
+
+    def acquire(self, proxy: Optional[str]) -> PooledDriver:
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            stale: List[PooledDriver] = []
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("driver pool is closed")
+                    pd = self._take_idle(proxy)
+                    if pd:
+                        self._busy += 1
+                        break
+                    if len(self._idle) + self._busy < self.size:
+                        self._busy += 1
+                        break
+                    if self._idle:
+                        # Чужий проксі: звільняємо найстаріший слот під нову ідентичність.
+                        stale.append(self._idle.pop(0))
+                        self._busy += 1
+                        break
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        raise PoolTimeout("no free browser in pool")
+                    self._cond.wait(left)
+            for old in stale:
+                self._quit(old)
+                self.recycled += 1
+            if pd is None:
+                try:
+                    with span("driver.start"):
+                        pd = PooledDriver(self._factory(proxy), proxy)
+                    self.created += 1
+                except Exception:
+                    with self._cond:
+                        self._busy -= 1
+                        self._cond.notify()
+                    raise
+                return pd
+            if self._healthy(pd):
+                return pd
+            self._quit(pd)
+            self.recycled += 1
+            with self._cond:
+                self._busy -= 1
+
+    def release(self, pd: PooledDriver, broken: bool = False) -> None:
+        pd.pages += 1
+        pd.last_used = time.monotonic()
+        drop = broken or self._closed or self._expired(pd)
+        with self._cond:
+            self._busy -= 1
+            if not drop:
+                self._idle.append(pd)
+            self._cond.notify()
+        if drop:
+            self._quit(pd)
+            self.recycled += 1
+
+    @contextmanager
+    def driver(self, proxy: Optional[str]) -> Iterator[object]:
+        with span("driver.acquire"):
+            pd = self.acquire(proxy)
+        try:
+            yield pd.driver
+        except Exception:
+            self.release(pd, broken=True)
+            raise
+        self.release(pd)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "busy": self._busy,
+                "created": self.created,
+                "recycled": self.recycled,
+            }
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for pd in idle:
+            self._quit(pd)
+
+
+def pool_from_env(factory: Callable[[Optional[str]], object]) -> DriverPool:
+    pool = DriverPool(
+        factory,
+        size=int(os.getenv("SCRAPER_POOL_SIZE", "2")),
+        max_pages=int(os.getenv("SCRAPER_DRIVER_MAX_PAGES", "50")),
+        max_age=float(os.getenv("SCRAPER_DRIVER_MAX_MINUTES", "10")) * 60,
+        acquire_timeout=float(os.getenv("SCRAPER_POOL_TIMEOUT", "60")),
+    )
+    atexit.register(pool.close)
+    return pool
@@ -0,0 +1,61 @@
+import threading
+
+import requests
+
+from typing import Callable, Dict, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+DEFAULT_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "uk-UA,uk;q=0.9,en-US;q=0.7,en;q=0.6",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Connection": "keep-alive",
+}
+
+
+class HttpFetcher:
+    """Легкий HTTP-бекенд: одна keep-alive сесія (і один UA) на кожен проксі."""
+
+    def __init__(
+        self,
+        ua_factory: Callable[[], str],
+        timeout: float = 15.0,
+        pool_maxsize: int = 10,
+    ):
+        self._ua_factory = ua_factory
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self._sessions: Dict[Optional[str], requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def _new_session(self, proxy: Optional[str]) -> requests.Session:
+        s = requests.Session()
+        retry = Retry(total=2, connect=2, read=1, backoff_factor=0.3,
+                      status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize, max_retries=retry)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        s.headers.update(DEFAULT_HEADERS)
+        s.headers["User-Agent"] = self._ua_factory()
+        if proxy:
+            s.proxies = {"http": proxy, "https": proxy}
+        return s
+
+    def session(self, proxy: Optional[str]) -> requests.Session:
+        with self._lock:
+            s = self._sessions.get(proxy)
+            if s is None:
+                s = self._sessions[proxy] = self._new_session(proxy)
+            return s
+
+    def get(self, url: str, proxy: Optional[str]) -> Tuple[int, str]:
+        r = self.session(proxy).get(url, timeout=self.timeout)
+        return r.status_code, r.text
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for s in sessions.values():
+            s.close()
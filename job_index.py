@@ -0,0 +1,215 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from metrics import log
+
+_TOKEN_RE = re.compile(r"\w+", re.U)
+
+_FIELDS = ("url", "title", "company", "salary", "employment", "posted")
+_LIST_FIELDS = ("tasks", "expectations", "description")
+
+
+class JobIndex:
+    """Локальний повнотекстовий індекс (SQLite FTS5) усіх побачених вакансій.
+
+    Запис іде пачками у фоновому потоці, тож обробники лише кладуть дані в буфер.
+    `coverage` пам'ятає, коли запит востаннє шукали наживо, — відповідати з індексу
+    можна лише поки це покриття свіже.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        fresh_for: float = 1800.0,
+        flush_interval: float = 2.0,
+        batch_size: int = 200,
+        age_weight: float = 0.05,
+    ):
+        self.fresh_for = fresh_for
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self.age_weight = age_weight
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        self._buf: List[Tuple[str, object]] = []
+        self._buf_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.stats = {"jobs_written": 0, "flushes": 0, "lookups": 0, "answered": 0}
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY, url TEXT, title TEXT, company TEXT, salary TEXT,
+                    employment TEXT, posted TEXT, tasks TEXT, expectations TEXT, description TEXT,
+                    indexed_at REAL);
+                CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+                    title, company, employment, tasks, expectations, description,
+                    tokenize = 'unicode61 remove_diacritics 2');
+                CREATE TABLE IF NOT EXISTS coverage (key TEXT PRIMARY KEY, searched_at REAL, ids TEXT);
+            """)
+            self._db.commit()
+        self._writer = threading.Thread(target=self._run, name="job-index", daemon=True)
+        self._writer.start()
+
+    # --- запис -------------------------------------------------------------
+
+    def add(self, job_id: Optional[int], job: Dict) -> None:
+        if job_id is not None:
+            self._push(("job", (job_id, job)))
+
+    def add_search(self, key: str, rows: List[Tuple[int, Dict]]) -> None:
+        """Рядки живої видачі: неповні записи + покриття запиту `key`."""
+        self._push(("search", (key, rows)))
+
+    def _push(self, item: Tuple[str, object]) -> None:
+        if self._closed:
+            return
+        with self._buf_lock:
+            self._buf.append(item)
+            full = len(self._buf) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    @staticmethod
+    def _merge(old: Optional[Dict], job: Dict) -> Dict:
+        # рядок видачі не має задач/опису — не затираємо те, що вже знали з деталей
+        rec = dict(old or {})
+        for f in _FIELDS:
+            v = job.get(f)
+            if v and (v != "—" or f not in rec):
+                rec[f] = v
+        for f in _LIST_FIELDS:
+            if job.get(f):
+                rec[f] = "\n".join(job[f])
+        return rec
+
+    def _write_job(self, job_id: int, job: Dict, now: float) -> None:
+        cols = _FIELDS + _LIST_FIELDS
+        row = self._db.execute(f"SELECT {', '.join(cols)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        rec = self._merge(dict(zip(cols, row)) if row else None, job)
+        vals = [rec.get(c) or "" for c in cols]
+        self._db.execute(
+            f"INSERT OR REPLACE INTO jobs (id, {', '.join(cols)}, indexed_at) VALUES (?, {', '.join('?' * len(cols))}, ?)",
+            (job_id, *vals, now),
+        )
+        self._db.execute("DELETE FROM jobs_fts WHERE rowid = ?", (job_id,))
+        self._db.execute(
+            "INSERT INTO jobs_fts (rowid, title, company, employment, tasks, expectations, description)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, rec.get("title", ""), rec.get("company", ""), rec.get("employment", ""),
+             rec.get("tasks", ""), rec.get("expectations", ""), rec.get("description", "")),
+        )
+        self.stats["jobs_written"] += 1
+
+    def flush(self) -> None:
+        with self._buf_lock:
+            batch, self._buf = self._buf, []
+        if not batch:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                for kind, payload in batch:
+                    if kind == "job":
+                        self._write_job(*payload, now)
+                    else:
+                        key, rows = payload
+                        for job_id, r in rows:
+                            self._write_job(job_id, r, now)
+                        self._db.execute(
+                            "INSERT OR REPLACE INTO coverage (key, searched_at, ids) VALUES (?, ?, ?)",
+                            (key, now, json.dumps([j for j, _ in rows])),
+                        )
+                self._db.commit()
+                self.stats["flushes"] += 1
+            except sqlite3.Error as e:
+                self._db.rollback()
+                log("index_flush_error", level="error", error=repr(e))
+
+    # --- читання -----------------------------------------------------------
+
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        return " ".join(f'"{t}"*' for t in _TOKEN_RE.findall(text))
+
+    def _age_days(self, posted: str) -> float:
+        try:
+            return min(60.0, max(0.0, (date.today() - date.fromisoformat(posted[:10])).days))
+        except ValueError:
+            return 30.0
+
+    def lookup(self, key: str, text: str, limit: int = 10, expand: bool = True) -> Optional[List[Dict]]:
+        """Рядки для /job з індексу або None, якщо покриття запиту немає чи воно застаріле.
+
+        Кандидати — вакансії з останньої живої видачі цього запиту плюс (expand) FTS-збіги;
+        ранжування: bm25 (менше — краще) плюс штраф за вік публікації.
+        """
+        self.stats["lookups"] += 1
+        with self._lock:
+            cov = self._db.execute("SELECT searched_at, ids FROM coverage WHERE key = ?", (key,)).fetchone()
+            if cov is None or time.time() - cov[0] > self.fresh_for:
+                return None
+            covered = json.loads(cov[1])
+            scores: Dict[int, float] = {j: 0.0 for j in covered}
+            match = self._fts_query(text)
+            if match:
+                for rowid, rank in self._db.execute(
+                    "SELECT rowid, bm25(jobs_fts) FROM jobs_fts WHERE jobs_fts MATCH ? ORDER BY rank LIMIT 200",
+                    (match,),
+                ):
+                    if expand or rowid in scores:
+                        scores[rowid] = rank
+            if not scores:
+                return None
+            marks = ", ".join("?" * len(scores))
+            rows = self._db.execute(
+                f"SELECT id, url, title, company, salary, employment, posted FROM jobs WHERE id IN ({marks})",
+                list(scores),
+            ).fetchall()
+        if len(rows) < min(limit, len(covered)):
+            return None
+        ranked = sorted(rows, key=lambda r: scores[r[0]] + self.age_weight * self._age_days(r[6] or ""))
+        self.stats["answered"] += 1
+        return [
+            {"url": url, "title": title, "company": company, "salary": salary, "employment": employment}
+            for _, url, title, company, salary, employment, _ in ranked[:limit]
+        ]
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._buf_lock:
+            pending = len(self._buf)
+        return {**self.stats, "pending": pending}
+
+    def close(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join(timeout=5)
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+
+def job_index_from_env() -> JobIndex:
+    return JobIndex(
+        os.getenv("INDEX_DB", "").strip() or None,
+        fresh_for=float(os.getenv("INDEX_FRESH_FOR", "1800")),
+        flush_interval=float(os.getenv("INDEX_FLUSH_INTERVAL", "2")),
+        batch_size=int(os.getenv("INDEX_BATCH", "200")),
+    )
@@ -1,9 +1,12 @@
 import os
 import re
 import html
+import math
+import time
 import asyncio
 
-from typing import Dict, List
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
 from dotenv import load_dotenv
 from aiogram import Bot, Dispatcher, types
 from aiogram.filters import Command
@@ -14,16 +17,65 @@ from aiogram.types import (
     ReplyKeyboardMarkup, KeyboardButton,
     InlineKeyboardMarkup, InlineKeyboardButton)
 from aiogram.client.default import DefaultBotProperties
-
-from scraper_workua import search_workua_detailed, scrape_workua_job
+from aiogram.exceptions import TelegramForbiddenError
+
+from cache import job_cache_from_env, result_store_from_env, search_cache_from_env
+from job_index import job_index_from_env
+from metrics import (
+    REGISTRY, inc, log, new_request_id, span, stats_collector,
+    metrics_port_from_env, start_http_server)
+from prefetch import prefetcher_from_env
+from sender import sender_from_env
+from scheduler import Priority, QueueFull, RateLimited, scheduler_from_env
+from subscriptions import subscriptions_from_env
+from task_queue import task_queue_from_env
+from webhook import webhook_from_env
+from scraper_async import close_engine
+from scraper_workua import DRIVER_POOL, PROXY_POOL, SELENIUM_TRAFFIC, PageGone, _job_id, _search_key, _strip_remote_token
 
 load_dotenv()
 API_TOKEN = os.getenv("BOT_TOKEN", "").strip()
 if not API_TOKEN:
     raise RuntimeError("BOT_TOKEN не знайдено")
 
+def _fsm_storage():
+    redis_url = os.getenv("REDIS_URL", "").strip()
+    if not redis_url:
+        return MemoryStorage()
+    from aiogram.fsm.storage.redis import RedisStorage  # потребує пакета redis
+
+    # стан діалогів спільний для всіх реплік бота
+    return RedisStorage.from_url(redis_url)
+
 bot = Bot(API_TOKEN, default=DefaultBotProperties(parse_mode="HTML"))
-dp = Dispatcher(storage=MemoryStorage())
+dp = Dispatcher(storage=_fsm_storage())
+SENDER = sender_from_env(bot)
+BOT_MODE = os.getenv("BOT_MODE", "polling").strip().lower()
+DRAIN_TIMEOUT = float(os.getenv("DRAIN_TIMEOUT", "30"))
+_INFLIGHT = {"updates": 0}
+
+@bot.session.middleware
+async def _time_telegram_send(make_request, bot, method):
+    with span("telegram.send", method=type(method).__name__):
+        return await make_request(bot, method)
+
+@dp.update.outer_middleware
+async def _trace_update(handler, event: types.Update, data):
+    new_request_id(f"u{event.update_id}-")
+    kind = event.event_type
+    inc("bot_updates_total", type=kind)
+    t0 = time.perf_counter()
+    _INFLIGHT["updates"] += 1
+    try:
+        with span("handler", type=kind):
+            return await handler(event, data)
+    finally:
+        _INFLIGHT["updates"] -= 1
+        log("update", type=kind, ms=round((time.perf_counter() - t0) * 1000, 1))
+
+def _log_error(where: str, e: Exception) -> None:
+    inc("bot_errors_total", where=where)
+    log("handler_error", level="error", where=where, error=repr(e))
 
 def reply_menu() -> ReplyKeyboardMarkup:
     return ReplyKeyboardMarkup(
@@ -61,6 +113,54 @@ def _fmt_job_card(job: Dict) -> str:
         text += f"\n\n📝 <b>Коротко:</b>\n{html.escape(desc)}"
     return text
 
+_WATCHED_FIELDS = {
+    "salary": "Зарплата",
+    "employment": "Зайнятість",
+    "posted": "Опубліковано",
+    "title": "Назва",
+    "company": "Компанія",
+    "tasks": "Задачі",
+    "expectations": "Вимоги",
+    "description": "Опис",
+}
+
+def _changed_fields(prev: Dict, job: Dict) -> List[str]:
+    return [f for f in _WATCHED_FIELDS if prev.get(f) != job.get(f)]
+
+# що саме показує кожна картка: (chat_id, id повідомлення з клавіатурою) ->
+# {"fields": поля з _WATCHED_FIELDS, "ids": id частин картки від першої до останньої}.
+# Refresh порівнює з цим, а не з кешем, який міг оновитись у фоні без правки картки.
+_SHOWN_CARDS: "OrderedDict[tuple, Dict]" = OrderedDict()
+SHOWN_CARDS_MAX = int(os.getenv("SHOWN_CARDS_MAX", "5000"))
+
+def _remember_card(chat_id: int, ids: List[int], job: Dict) -> None:
+    if not ids:
+        return
+    key = (chat_id, ids[-1])  # клавіатура — під останньою частиною
+    _SHOWN_CARDS[key] = {"fields": {f: job.get(f) for f in _WATCHED_FIELDS}, "ids": list(ids)}
+    _SHOWN_CARDS.move_to_end(key)
+    while len(_SHOWN_CARDS) > SHOWN_CARDS_MAX:
+        _SHOWN_CARDS.popitem(last=False)
+
+def _fmt_changes(prev: Dict, job: Dict, fields: List[str]) -> str:
+    lines = ["🆕 <b>Що змінилось:</b>"]
+    for f in fields:
+        old, new = prev.get(f), job.get(f)
+        if isinstance(new, list) or isinstance(old, list):
+            lines.append(f"• {_WATCHED_FIELDS[f]}: оновлено")
+        else:
+            lines.append(f"• {_WATCHED_FIELDS[f]}: {html.escape(str(old or '—'))} → {html.escape(str(new or '—'))}")
+    return "\n".join(lines)
+
+async def _send_job_card(chat_id: int, job: Dict) -> None:
+    msgs = await SENDER.send_all(
+        chat_id,
+        _fmt_job_card(job),
+        disable_web_page_preview=False,
+        reply_markup=inline_under_job(job["url"]),
+    )
+    _remember_card(chat_id, [m.message_id for m in msgs if isinstance(m, types.Message)], job)
+
 def _fmt_results_text(rows: List[Dict], query: str) -> str:
     lines = [
         f"Знайшов {len(rows)} вакансій за запитом: <b>{html.escape(query)}</b>\n"
@@ -96,26 +196,154 @@ _WORKUA_JOB_RE = re.compile(r"https?://(www\.)?work\.ua/jobs/\d+/?", re.I)
 def _is_workua_job_url(url: str) -> bool:
     return bool(_WORKUA_JOB_RE.fullmatch(url.strip()))
 
-async def _search_detailed_async(q: str, limit: int = 10) -> List[Dict]:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, search_workua_detailed, q, limit)
+OnQueued = Optional[Callable[[int], Awaitable[None]]]
+
+SEARCHES = search_cache_from_env()
+RESULTS = result_store_from_env()
+SCHEDULER = scheduler_from_env(DRIVER_POOL.size * 2)
+
+JOB_INDEX = job_index_from_env()
+INDEX_MODE = os.getenv("INDEX_MODE", "auto").strip().lower()
+
+def _coverage_key(q: str) -> str:
+    return _search_key(q, 0)
+
+TASKS = task_queue_from_env()
+
+async def _fetch_search(q: str, limit: int) -> List[Dict]:
+    rows = await TASKS.search(q, limit)
+    JOB_INDEX.add_search(_coverage_key(q), [(j, r) for r in rows if (j := _job_id(r["url"])) is not None])
+    return rows
 
-async def _scrape_async(url: str) -> Dict:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, scrape_workua_job, url)
+async def _fetch_job(url: str, fresh: bool = False) -> Dict:
+    job = await TASKS.job(url, fresh)
+    JOB_INDEX.add(_job_id(url), job)
+    return job
 
-JOB_CACHE: dict[int, List[Dict]] = {}
+async def _index_lookup(q: str, limit: int) -> Optional[List[Dict]]:
+    """Відповідь з локального індексу, якщо покриття запиту свіже (INDEX_MODE=auto)."""
+    if INDEX_MODE != "auto":
+        return None
+    text, remote = _strip_remote_token(q)
+    return await asyncio.to_thread(JOB_INDEX.lookup, _coverage_key(q), text, limit, not remote)
+
+JOB_DETAILS = job_cache_from_env()
+PREFETCH = prefetcher_from_env(
+    JOB_DETAILS,
+    lambda url: SCHEDULER.submit(Priority.PREFETCH, lambda: _fetch_job(url)),
+    _job_id,
+)
+
+SUBSCRIBE_LIMIT = int(os.getenv("SUBSCRIBE_LIMIT", "20"))
+SUBSCRIBE_MAX_PER_CHAT = int(os.getenv("SUBSCRIBE_MAX_PER_CHAT", "5"))
+
+def _subscription_key(q: str) -> str:
+    return _search_key(q, SUBSCRIBE_LIMIT)
+
+def _crawl_search(q: str) -> Awaitable[List[Dict]]:
+    return SEARCHES.aget_or_fetch(
+        _subscription_key(q),
+        lambda: SCHEDULER.submit(Priority.CRAWL, lambda: _fetch_search(q, SUBSCRIBE_LIMIT)),
+    )
+
+def _fmt_new_jobs(query: str, rows: List[Dict]) -> str:
+    lines = [f"🔔 Нові вакансії за підпискою <b>{html.escape(query)}</b>:", ""]
+    for r in rows:
+        extras = " · ".join(html.escape(x) for x in (r.get("company"), r.get("salary")) if x and x != "—")
+        line = f"• <a href='{html.escape(r['url'])}'>{html.escape(r.get('title', '—'))}</a>"
+        if extras:
+            line += f" — {extras}"
+        lines.append(line)
+    return "\n".join(lines)
+
+async def _notify_subscriber(chat_id: int, text: str) -> None:
+    try:
+        await SENDER.send(chat_id, text, disable_web_page_preview=True)
+    except TelegramForbiddenError:
+        # бота заблокували — підписки цього чату більше нікому не потрібні
+        await asyncio.to_thread(SUBSCRIPTIONS.store.unsubscribe, chat_id)
+        raise
+
+SUBSCRIPTIONS = subscriptions_from_env(_crawl_search, _fmt_new_jobs, _notify_subscriber, _job_id)
+
+def _proxy_totals() -> Dict[str, int]:
+    rows = PROXY_POOL.snapshot()
+    return {
+        "ok": sum(r["ok"] for r in rows),
+        "failures": sum(r["fail"] for r in rows),
+        "bans": sum(r["bans"] for r in rows),
+        "quarantined": sum(1 for r in rows if r["quarantined_for"]),
+        "size": len(rows),
+    }
+
+REGISTRY.register(stats_collector("job_cache", lambda: JOB_DETAILS.stats, tuple(JOB_DETAILS.stats)))
+REGISTRY.register(stats_collector("results", RESULTS.snapshot, ("hits", "backend_hits", "misses", "expired")))
+REGISTRY.register(stats_collector("job_index", JOB_INDEX.snapshot, ("jobs_written", "flushes", "lookups", "answered")))
+REGISTRY.register(stats_collector("search_cache", SEARCHES.snapshot, ("hits", "misses", "coalesced", "fetches")))
+REGISTRY.register(stats_collector("prefetch", PREFETCH.snapshot, tuple(PREFETCH.stats)))
+REGISTRY.register(stats_collector("scrape_queue", SCHEDULER.snapshot, ("submitted", "queued", "rejected", "rate_limited")))
+REGISTRY.register(stats_collector("driver_pool", DRIVER_POOL.stats, ("created", "recycled")))
+REGISTRY.register(stats_collector("selenium_traffic", lambda: SELENIUM_TRAFFIC, tuple(SELENIUM_TRAFFIC)))
+REGISTRY.register(stats_collector("subscriptions", SUBSCRIPTIONS.snapshot, ("crawls", "errors", "new_jobs", "notifications", "notify_errors")))
+REGISTRY.register(stats_collector("telegram_sender", SENDER.snapshot, tuple(SENDER.stats)))
+REGISTRY.register(stats_collector("proxy", _proxy_totals, ("ok", "failures", "bans")))
+REGISTRY.register(stats_collector("bot_inflight", lambda: _INFLIGHT))
+REGISTRY.register(stats_collector("task_queue", TASKS.snapshot, ("submitted", "cache_hits", "timeouts", "errors")))
+
+async def _admitted(user_id: Optional[int], priority: Priority, fn, on_queued: OnQueued = None):
+    # токен користувача береться лише тоді, коли справді йдемо скрапити:
+    # відповідь з кешу чи префетчу ліміт не витрачає
+    SCHEDULER.admit(user_id)
+    return await SCHEDULER.submit(priority, fn, on_queued)
+
+async def _search_detailed_async(
+    q: str, limit: int = 10, user_id: Optional[int] = None, on_queued: OnQueued = None
+) -> List[Dict]:
+    async with PREFETCH.interactive():
+        return await SEARCHES.aget_or_fetch(
+            _search_key(q, limit),
+            lambda: _admitted(user_id, Priority.SEARCH, lambda: _fetch_search(q, limit), on_queued),
+        )
+
+async def _scrape_async(
+    url: str,
+    refresh: bool = False,
+    user_id: Optional[int] = None,
+    priority: Priority = Priority.OPEN,
+    on_queued: OnQueued = None,
+) -> Dict:
+    async with PREFETCH.interactive():
+        return await JOB_DETAILS.aget_or_fetch(
+            _job_id(url),
+            lambda: _admitted(user_id, priority, lambda: _fetch_job(url, refresh), on_queued),
+            bypass=refresh,
+        )
+
+def _queue_text(pos: int) -> str:
+    return f"⏳ Ти в черзі: {pos}. Зачекай трохи…"
+
+def _busy_text(e: Exception) -> Optional[str]:
+    if isinstance(e, RateLimited):
+        return f"Забагато запитів. Спробуй через {math.ceil(e.retry_after)} с."
+    if isinstance(e, QueueFull):
+        return "Зараз забагато запитів у черзі. Спробуй трохи пізніше."
+    if isinstance(e, PageGone):
+        return "Цієї вакансії вже немає на Work.ua."
+    return None
 
 class ParsSite(StatesGroup):
     waiting_for_url = State()
 
 @dp.message(Command("start", "help"))
 async def cmd_start(message: types.Message):
-    await message.answer(
+    await SENDER.send(
+        message.chat.id,
         "Привіт! Я шукаю та стисло описую вакансії з Work.ua.\n\n"
         "Команди:\n"
         "• <code>/job python django</code> — знайти за запитом і показати список\n"
-        "• <code>/pars site</code> — надішли конкретний URL вакансії для парсу\n\n"
+        "• <code>/pars site</code> — надішли конкретний URL вакансії для парсу\n"
+        "• <code>/subscribe python django</code> — надсилати нові вакансії за запитом\n"
+        "• <code>/unsubscribe</code> — керувати підписками\n\n"
         "Підтримую ключові слова <i>remote/віддалено/дистанційно</i>.\n"
         "У пошуку використовую фільтр «Шукати не тільки у заголовку».",
         reply_markup=reply_menu(),
@@ -125,132 +353,264 @@ async def cmd_start(message: types.Message):
 async def cmd_job(message: types.Message):
     parts = message.text.split(maxsplit=1)
     if len(parts) == 1:
-        await message.answer(
+        await SENDER.send(
+            message.chat.id,
             "Напиши так: <code>/job remote python django</code>\n"
             " або просто надішли текст після /job."
         )
         return
 
     query = parts[1].strip()
-    await message.answer("Шукаю вакансії…")
+    status = await SENDER.send(message.chat.id, "Шукаю вакансії…")
 
     try:
-        rows = await _search_detailed_async(query, limit=10)
+        rows = await _index_lookup(query, 10)
+        if rows is None:
+            rows = await _search_detailed_async(
+                query, limit=10, user_id=message.from_user.id,
+                on_queued=lambda pos: SENDER.edit(status, _queue_text(pos)),
+            )
         if not rows:
-            await message.answer("Нічого не знайшов 😕. Спробуй інший запит.")
+            await SENDER.send(message.chat.id, "Нічого не знайшов 😕. Спробуй інший запит.")
             return
 
-        JOB_CACHE[message.from_user.id] = rows
+        await RESULTS.put(message.from_user.id, rows)
+        PREFETCH.schedule([r["url"] for r in rows])
 
-        await message.answer(
+        await SENDER.send(
+            message.chat.id,
             _fmt_results_text(rows, query),
             reply_markup=_make_index_keyboard(len(rows))
         )
     except Exception as e:
-        print("[/job search error]", e)
-        await message.answer("Сталася помилка під час пошуку.")
+        _log_error("/job", e)
+        await SENDER.send(message.chat.id, _busy_text(e) or "Сталася помилка під час пошуку.")
 
 @dp.callback_query(lambda c: c.data.startswith("open:"))
 async def on_open_job(cb: types.CallbackQuery):
     try:
         idx = int(cb.data.split(":")[1])
-        rows = JOB_CACHE.get(cb.from_user.id, [])
+        rows = await RESULTS.get(cb.from_user.id)
         if idx < 0 or idx >= len(rows):
             await cb.answer("Список застарів. Зроби новий пошук /job.")
             return
 
-        processing_msg = await cb.message.answer("⏳ Обробляю вакансію...")
+        processing_msg = await SENDER.send(cb.message.chat.id, "⏳ Обробляю вакансію...")
 
         url = rows[idx]["url"]
-        job = await _scrape_async(url)
+        await PREFETCH.note_open(url)
+        job = await _scrape_async(
+            url, user_id=cb.from_user.id,
+            on_queued=lambda pos: SENDER.edit(processing_msg, _queue_text(pos)),
+        )
 
         await processing_msg.delete()
 
-        await cb.message.answer(
-            _fmt_job_card(job),
-            disable_web_page_preview=False,
-            reply_markup=inline_under_job(job["url"]),
-        )
+        await _send_job_card(cb.message.chat.id, job)
         await cb.answer()
     except Exception as e:
-        print("[open job error]", e)
-        await cb.answer("Не вдалось завантажити вакансію.")
+        _log_error("open", e)
+        await cb.answer(_busy_text(e) or "Не вдалось завантажити вакансію.")
 
 @dp.callback_query(lambda c: c.data.startswith("refresh|"))
 async def on_refresh(cb: types.CallbackQuery):
     _, url = cb.data.split("|", 1)
+    answered = False
+
+    async def on_queued(pos: int) -> None:
+        nonlocal answered
+        answered = True
+        await cb.answer(_queue_text(pos))
+
+    chat_id = cb.message.chat.id
     try:
-        job = await _scrape_async(url)
-        await cb.message.edit_text(
-            _fmt_job_card(job),
+        shown = _SHOWN_CARDS.get((chat_id, cb.message.message_id))
+        prev = shown["fields"] if shown is not None else None
+        job = await _scrape_async(
+            url, refresh=True, user_id=cb.from_user.id,
+            priority=Priority.REFRESH, on_queued=on_queued,
+        )
+        # без запису (перезапуск, інша репліка) — завжди правимо; незмінність покаже edit_all
+        changed = _changed_fields(prev, job) if prev is not None else None
+        if changed == []:
+            inc("refresh_unchanged_total")
+            if not answered:
+                await cb.answer("Без змін ✅")
+            return
+        text = _fmt_job_card(job)
+        if changed:
+            text = _fmt_changes(prev, job, changed) + "\n\n" + text
+        # правимо частини картки на місці, а не дописуємо хвіст новими повідомленнями
+        ids, modified = await SENDER.edit_all(
+            chat_id, shown["ids"] if shown is not None else [cb.message.message_id], text,
             disable_web_page_preview=False,
             reply_markup=inline_under_job(job["url"]),
         )
-        await cb.answer("Оновлено ✅")
+        if not modified:
+            changed = []  # картку вже показано в актуальному вигляді
+        _SHOWN_CARDS.pop((chat_id, cb.message.message_id), None)
+        _remember_card(chat_id, ids, job)
+        if not answered:
+            if changed:
+                await cb.answer("Оновлено: " + ", ".join(_WATCHED_FIELDS[f].lower() for f in changed))
+            else:
+                await cb.answer("Без змін ✅" if changed == [] else "Оновлено ✅")
     except Exception as e:
-        await cb.answer("Помилка оновлення")
-        print("[inline refresh error]", e)
+        if not answered:
+            await cb.answer(_busy_text(e) or "Помилка оновлення")
+        _log_error("refresh", e)
+
+def _unsubscribe_keyboard(subs) -> InlineKeyboardMarkup:
+    kb = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=f"❌ {q[:40]}", callback_data=f"unsub:{sub_id}")] for sub_id, q in subs
+    ])
+    if len(subs) > 1:
+        kb.inline_keyboard.append([InlineKeyboardButton(text="Скасувати всі", callback_data="unsub:all")])
+    return kb
+
+@dp.message(Command("subscribe"))
+async def cmd_subscribe(message: types.Message):
+    parts = message.text.split(maxsplit=1)
+    if len(parts) == 1:
+        await SENDER.send(message.chat.id, "Напиши так: <code>/subscribe remote python django</code>")
+        return
+    query = parts[1].strip()
+    chat_id = message.chat.id
+    if len(await asyncio.to_thread(SUBSCRIPTIONS.store.list, chat_id)) >= SUBSCRIBE_MAX_PER_CHAT:
+        await SENDER.send(message.chat.id, f"Можна мати не більше {SUBSCRIBE_MAX_PER_CHAT} підписок. Прибери зайві: /unsubscribe")
+        return
+    if not await asyncio.to_thread(SUBSCRIPTIONS.store.subscribe, chat_id, _subscription_key(query), query):
+        await SENDER.send(message.chat.id, "Ти вже підписаний на цей запит.")
+        return
+    await SENDER.send(
+        message.chat.id,
+        f"✅ Підписка на <b>{html.escape(query)}</b> оформлена.\n"
+        f"Перевіряю раз на {max(1, round(SUBSCRIPTIONS.interval / 60))} хв і надсилаю лише нові вакансії."
+    )
+
+@dp.message(Command("unsubscribe"))
+async def cmd_unsubscribe(message: types.Message):
+    parts = message.text.split(maxsplit=1)
+    chat_id = message.chat.id
+    if len(parts) > 1:
+        arg = parts[1].strip()
+        if arg.lower() in ("all", "всі"):
+            n = await asyncio.to_thread(SUBSCRIPTIONS.store.unsubscribe, chat_id)
+        else:
+            n = await asyncio.to_thread(SUBSCRIPTIONS.store.unsubscribe, chat_id, key=_subscription_key(arg))
+        await SENDER.send(message.chat.id, "Підписку скасовано." if n else "Такої підписки немає.")
+        return
+    subs = await asyncio.to_thread(SUBSCRIPTIONS.store.list, chat_id)
+    if not subs:
+        await SENDER.send(message.chat.id, "У тебе немає підписок. Оформити: <code>/subscribe python django</code>")
+        return
+    await SENDER.send(message.chat.id, "Твої підписки — натисни, щоб скасувати:", reply_markup=_unsubscribe_keyboard(subs))
+
+@dp.callback_query(lambda c: c.data.startswith("unsub:"))
+async def on_unsubscribe(cb: types.CallbackQuery):
+    arg = cb.data.split(":", 1)[1]
+    chat_id = cb.message.chat.id
+    if arg == "all":
+        await asyncio.to_thread(SUBSCRIPTIONS.store.unsubscribe, chat_id)
+    elif arg.isdigit():
+        await asyncio.to_thread(SUBSCRIPTIONS.store.unsubscribe, chat_id, sub_id=int(arg))
+    subs = await asyncio.to_thread(SUBSCRIPTIONS.store.list, chat_id)
+    if subs:
+        await cb.message.edit_reply_markup(reply_markup=_unsubscribe_keyboard(subs))
+    else:
+        await SENDER.edit(cb.message, "Усі підписки скасовано.")
+    await cb.answer("Скасовано")
 
 @dp.message(lambda m: m.text in {"📰 Отримати вакансії", "🧹 Прибрати меню"})
 async def on_reply_buttons(message: types.Message):
     if message.text == "📰 Отримати вакансії":
-        await message.answer(
+        await SENDER.send(
+            message.chat.id,
             "Введи запит у форматі: <code>/job python django</code>\n"
             "Наприклад: <code>/job remote python junior</code>"
         )
     else:
-        await message.answer("Ок, приховав меню.", reply_markup=types.ReplyKeyboardRemove())
+        await SENDER.send(message.chat.id, "Ок, приховав меню.", reply_markup=types.ReplyKeyboardRemove())
 
 @dp.message(Command("pars"))
 async def cmd_pars(message: types.Message, state: FSMContext):
     parts = message.text.split(maxsplit=1)
     if len(parts) == 1:
-        await message.answer("Використання: <code>/pars site</code> — далі надішли URL вакансії Work.ua")
+        await SENDER.send(message.chat.id, "Використання: <code>/pars site</code> — далі надішли URL вакансії Work.ua")
         return
 
     arg = parts[1].strip()
     if arg.lower() == "site":
-        await message.answer("Надішли повний URL вакансії Work.ua (https://www.work.ua/jobs/<id>/).")
+        await SENDER.send(message.chat.id, "Надішли повний URL вакансії Work.ua (https://www.work.ua/jobs/<id>/).")
         await state.set_state(ParsSite.waiting_for_url)
         return
 
     if _is_workua_job_url(arg):
         try:
-            job = await _scrape_async(arg)
-            await message.answer(
-                _fmt_job_card(job),
-                disable_web_page_preview=False,
-                reply_markup=inline_under_job(job["url"]),
+            job = await _scrape_async(
+                arg, user_id=message.from_user.id,
+                on_queued=lambda pos: SENDER.send(message.chat.id, _queue_text(pos)),
             )
+            await _send_job_card(message.chat.id, job)
         except Exception as e:
-            await message.answer("Не вдалося отримати вакансію. Перевір посилання або спробуй пізніше.")
-            print("[/pars url error]", e)
+            await SENDER.send(message.chat.id, _busy_text(e) or "Не вдалося отримати вакансію. Перевір посилання або спробуй пізніше.")
+            _log_error("/pars", e)
         return
 
-    await message.answer("Невірний формат. Або /pars site, або /job <запит>.")
+    await SENDER.send(message.chat.id, "Невірний формат. Або /pars site, або /job <запит>.")
 
 @dp.message(ParsSite.waiting_for_url)
 async def pars_receive_url(message: types.Message, state: FSMContext):
     url = message.text.strip()
     if not _is_workua_job_url(url):
-        await message.answer("Це не схоже на URL вакансії Work.ua. Приклад:\nhttps://www.work.ua/jobs/7208953/")
+        await SENDER.send(message.chat.id, "Це не схоже на URL вакансії Work.ua. Приклад:\nhttps://www.work.ua/jobs/7208953/")
         return
     try:
-        job = await _scrape_async(url)
-        await message.answer(
-            _fmt_job_card(job),
-            disable_web_page_preview=False,
-            reply_markup=inline_under_job(job["url"]),
+        job = await _scrape_async(
+            url, user_id=message.from_user.id,
+            on_queued=lambda pos: SENDER.send(message.chat.id, _queue_text(pos)),
         )
+        await _send_job_card(message.chat.id, job)
     except Exception as e:
-        await message.answer("Не вдалося отримати вакансію. Спробуй інший URL або пізніше.")
-        print("[pars state error]", e)
+        await SENDER.send(message.chat.id, _busy_text(e) or "Не вдалося отримати вакансію. Спробуй інший URL або пізніше.")
+        _log_error("pars_state", e)
     finally:
         await state.clear()
 
+async def _drain() -> None:
+    """Дає доробити апдейти, що вже в обробці (разом із їхніми скрапами), до закриття пулів."""
+    deadline = time.monotonic() + DRAIN_TIMEOUT
+    while _INFLIGHT["updates"] and time.monotonic() < deadline:
+        await asyncio.sleep(0.2)
+    log("drain", left=_INFLIGHT["updates"], scrapes=SCHEDULER.active)
+
+def _health() -> Dict[str, int]:
+    return {"updates_inflight": _INFLIGHT["updates"], "scrapes_active": SCHEDULER.active,
+            "scrapes_queued": SCHEDULER.depth}
+
 async def main():
-    print("Aiogram v3 bot is running...")
-    await dp.start_polling(bot)
+    print(f"Aiogram v3 bot is running ({BOT_MODE})...")
+    # dp.shutdown викликає обробники по черзі: спершу дренаж, далі фонові задачі й пули
+    dp.shutdown.register(_drain)
+    dp.shutdown.register(PREFETCH.close)
+    dp.shutdown.register(SUBSCRIPTIONS.close)
+    dp.shutdown.register(TASKS.close)
+    dp.shutdown.register(dp.storage.close)
+    dp.shutdown.register(close_engine)
+    dp.shutdown.register(DRIVER_POOL.close)
+    dp.shutdown.register(JOB_DETAILS.close)
+    dp.shutdown.register(RESULTS.close)
+    dp.shutdown.register(JOB_INDEX.close)
+    port, host = metrics_port_from_env()
+    server = webhook_from_env(dp, bot, API_TOKEN, port, _health) if BOT_MODE == "webhook" else None
+    if port and not (server and server.with_metrics):
+        runner = await start_http_server(port, host)
+        dp.shutdown.register(runner.cleanup)
+    SUBSCRIPTIONS.start()
+    if server is not None:
+        await server.run()
+    else:
+        await dp.start_polling(bot)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,54 @@
+import re
+
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+_END = ""
+
+
+class PrefixMatcher:
+    """Trie префіксів: за один прохід рядка повертає всі категорії,
+    хоча б один заголовок яких є префіксом рядка (аналог str.startswith(tuple))."""
+
+    def __init__(self, vocab: Dict[str, Iterable[str]]):
+        self._root: dict = {}
+        self.categories = tuple(vocab)
+        for cat, prefixes in vocab.items():
+            for prefix in prefixes:
+                if prefix:
+                    self._add(prefix, cat)
+
+    def _add(self, prefix: str, cat: str) -> None:
+        node = self._root
+        for ch in prefix:
+            node = node.setdefault(ch, {})
+        node[_END] = node.get(_END, frozenset()) | {cat}
+
+    def match(self, text: str) -> FrozenSet[str]:
+        found: FrozenSet[str] = frozenset()
+        node = self._root
+        for ch in text:
+            node = node.get(ch)
+            if node is None:
+                break
+            cats = node.get(_END)
+            if cats:
+                found = found | cats
+        return found
+
+
+class KeywordMatcher:
+    """Одна скомпільована альтернатива замість regex/`in` на кожне ключове слово."""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(dict.fromkeys(k for k in keywords if k))
+        self._order = {k: i for i, k in enumerate(self.keywords)}
+        alt = "|".join(re.escape(k) for k in sorted(self.keywords, key=len, reverse=True))
+        self._any = re.compile(f"(?:{alt})" if alt else r"(?!x)x")
+        self._word = re.compile(rf"(?<!\w)(?:{alt})(?!\w)" if alt else r"(?!x)x")
+
+    def find(self, text: str, whole_words: bool = True) -> Set[str]:
+        rx = self._word if whole_words else self._any
+        return {m.group(0) for m in rx.finditer(text or "")}
+
+    def ordered(self, found: Iterable[str]) -> List[str]:
+        return sorted(set(found), key=lambda k: self._order.get(k, len(self._order)))
@@ -0,0 +1,219 @@
+import os
+import sys
+import json
+import time
+import uuid
+import functools
+import threading
+import contextvars
+
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, str, Dict[str, str], float]  # (name, type, labels, value)
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+REQUEST_ID: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+
+def new_request_id(prefix: str = "") -> str:
+    rid = f"{prefix}{uuid.uuid4().hex[:12]}"
+    REQUEST_ID.set(rid)
+    return rid
+
+
+def log(event: str, level: str = "info", **fields) -> None:
+    """Структурований лог: один JSON-рядок на подію, з request_id поточного контексту."""
+    rec = {"ts": round(time.time(), 3), "level": level, "event": event}
+    rid = REQUEST_ID.get()
+    if rid:
+        rec["request_id"] = rid
+    rec.update(fields)
+    print(json.dumps(rec, ensure_ascii=False, default=str), file=sys.stderr if level == "error" else sys.stdout,
+          flush=True)
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v: float) -> None:
+        for i, b in enumerate(BUCKETS):
+            if v <= b:
+                self.counts[i] += 1
+                break
+        self.sum += v
+        self.count += 1
+
+
+class Registry:
+    """Мінімальний реєстр у форматі Prometheus text exposition: лічильники,
+    гістограми й колектори, що читають stats-словники компонентів на льоту."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._hists: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def describe(self, name: str, text: str) -> None:
+        self._help[name] = text
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._hists.setdefault(name, {})
+            h = series.get(key)
+            if h is None:
+                h = series[key] = _Histogram()
+            h.observe(value)
+
+    def register(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        self._collectors.append(collector)
+
+    @staticmethod
+    def _fmt_labels(labels: Dict[str, str]) -> str:
+        if not labels:
+            return ""
+        body = ",".join(
+            '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for k, v in labels.items()
+        )
+        return "{" + body + "}"
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        def head(name: str, kind: str) -> None:
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            counters = {n: dict(s) for n, s in self._counters.items()}
+            hists = {n: {k: (list(h.counts), h.sum, h.count) for k, h in s.items()} for n, s in self._hists.items()}
+        for name, series in sorted(counters.items()):
+            head(name, "counter")
+            for key, v in series.items():
+                lines.append(f"{name}{self._fmt_labels(dict(key))} {v:g}")
+        for name, series in sorted(hists.items()):
+            head(name, "histogram")
+            for key, (counts, total, count) in series.items():
+                acc = 0
+                for b, c in zip(BUCKETS, counts):
+                    acc += c
+                    lines.append(f"{name}_bucket{self._fmt_labels({**dict(key), 'le': f'{b:g}'})} {acc}")
+                lines.append(f"{name}_bucket{self._fmt_labels({**dict(key), 'le': '+Inf'})} {count}")
+                lines.append(f"{name}_sum{self._fmt_labels(dict(key))} {total:.6f}")
+                lines.append(f"{name}_count{self._fmt_labels(dict(key))} {count}")
+        seen = set()
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception as e:
+                log("metrics_collector_error", level="error", error=repr(e))
+                continue
+            for name, kind, labels, value in samples:
+                if name not in seen:
+                    seen.add(name)
+                    head(name, kind)
+                lines.append(f"{name}{self._fmt_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+REGISTRY.describe("bot_stage_seconds", "Тривалість етапів конвеєра (driver, навігація, очікування, парсинг, відправка)")
+REGISTRY.describe("scraper_retries_total", "Повтори завантаження сторінки")
+REGISTRY.describe("scraper_fallbacks_total", "Переходи з HTTP-бекенда на Selenium")
+
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+
+
+@contextmanager
+def span(stage: str, **labels) -> Iterator[None]:
+    """Міряє блок у bot_stage_seconds{stage=...}; помилки рахуються з outcome="error"."""
+    t0 = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        REGISTRY.observe("bot_stage_seconds", time.perf_counter() - t0, stage=stage, outcome=outcome, **labels)
+
+
+def timed(stage: str):
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def stats_collector(
+    prefix: str,
+    snapshot: Callable[[], Dict],
+    counters: Iterable[str] = (),
+    **labels,
+) -> Callable[[], List[Sample]]:
+    """Колектор для компонентів з `stats`/`snapshot()`: ключі з `counters` —
+    лічильники `<prefix>_<key>_total`, решта числових — gauge `<prefix>_<key>`."""
+    counters = frozenset(counters)
+
+    def collect() -> List[Sample]:
+        out: List[Sample] = []
+        for key, value in snapshot().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if key in counters:
+                out.append((f"{prefix}_{key}_total", "counter", labels, value))
+            else:
+                out.append((f"{prefix}_{key}", "gauge", labels, value))
+        return out
+
+    return collect
+
+
+def add_routes(app) -> None:
+    """Додає GET /metrics до aiohttp-застосунку."""
+    from aiohttp import web
+
+    async def handle(_request):
+        return web.Response(text=REGISTRY.render(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    app.router.add_get("/metrics", handle)
+
+
+async def start_http_server(port: int, host: str = "127.0.0.1"):
+    """Окремий aiohttp-сервер з /metrics; повертає runner для cleanup()."""
+    from aiohttp import web
+
+    app = web.Application()
+    add_routes(app)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    log("metrics_listen", host=host, port=port)
+    return runner
+
+
+def metrics_port_from_env() -> Tuple[int, str]:
+    return int(os.getenv("METRICS_PORT", "9108")), os.getenv("METRICS_HOST", "127.0.0.1")
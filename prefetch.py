@@ -0,0 +1,147 @@
+import os
+import asyncio
+
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from cache import JobCache
+from metrics import log
+
+
+class Prefetcher:
+    """Фонове завантаження деталей перших N вакансій з видачі у спільний кеш.
+
+    Поки триває хоча б один інтерактивний запит (interactive()), воркери
+    стоять, а вже запущені префетчі скасовуються й повертаються в чергу.
+    """
+
+    def __init__(
+        self,
+        cache: JobCache,
+        fetch: Callable[[str], Awaitable[Dict]],
+        job_id: Callable[[str], Optional[int]],
+        top_n: int = 3,
+        workers: int = 1,
+        max_queue: int = 200,
+    ):
+        self.cache = cache
+        self._fetch = fetch
+        self._job_id = job_id
+        self.top_n = top_n
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self._queue: Deque[str] = deque()
+        self._queued: Set[str] = set()
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._interactive = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._workers: List[asyncio.Task] = []
+        self._prefetched: "OrderedDict[int, None]" = OrderedDict()
+        self.stats = {"scheduled": 0, "fetched": 0, "skipped": 0, "preempted": 0,
+                      "errors": 0, "opens": 0, "hits": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.top_n > 0
+
+    def _start(self) -> None:
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def schedule(self, urls: List[str]) -> None:
+        if not self.enabled:
+            return
+        self._start()
+        for url in urls[: self.top_n]:
+            if url in self._queued or url in self._inflight or len(self._queue) >= self.max_queue:
+                continue
+            self._queue.append(url)
+            self._queued.add(url)
+            self.stats["scheduled"] += 1
+        self._wakeup.set()
+
+    @asynccontextmanager
+    async def interactive(self) -> AsyncIterator[None]:
+        self._interactive += 1
+        self._idle.clear()
+        for url, task in list(self._inflight.items()):
+            task.cancel()
+        try:
+            yield
+        finally:
+            self._interactive -= 1
+            if self._interactive == 0:
+                self._idle.set()
+
+    async def note_open(self, url: str) -> None:
+        """Враховує відкриття вакансії користувачем для hit rate префетчу."""
+        job_id = self._job_id(url)
+        self.stats["opens"] += 1
+        if job_id is not None and job_id in self._prefetched and await self.cache.peek(job_id):
+            self.stats["hits"] += 1
+            del self._prefetched[job_id]
+        if self.stats["opens"] % 20 == 0:
+            log("prefetch_stats", **self.snapshot())
+
+    def snapshot(self) -> Dict[str, float]:
+        opens = self.stats["opens"]
+        return {**self.stats, "queued": len(self._queue),
+                "hit_rate": round(self.stats["hits"] / opens, 3) if opens else 0.0}
+
+    async def _worker(self) -> None:
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            await self._idle.wait()
+            if not self._queue:
+                continue
+            url = self._queue.popleft()
+            self._queued.discard(url)
+            job_id = self._job_id(url)
+            if job_id is None or await self.cache.peek(job_id):
+                self.stats["skipped"] += 1
+                continue
+            task = asyncio.ensure_future(self._fetch(url))
+            self._inflight[url] = task
+            try:
+                await self.cache.put(job_id, await task)
+                self._prefetched[job_id] = None
+                while len(self._prefetched) > 1000:
+                    self._prefetched.popitem(last=False)
+                self.stats["fetched"] += 1
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise
+                # витіснили інтерактивним запитом — повернемо на початок черги
+                self.stats["preempted"] += 1
+                if url not in self._queued:
+                    self._queue.appendleft(url)
+                    self._queued.add(url)
+            except Exception as e:
+                self.stats["errors"] += 1
+                log("prefetch_error", level="warning", url=url, error=repr(e))
+            finally:
+                self._inflight.pop(url, None)
+
+    async def close(self) -> None:
+        workers, self._workers = self._workers, []
+        for t in [*workers, *self._inflight.values()]:
+            t.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+def prefetcher_from_env(
+    cache: JobCache,
+    fetch: Callable[[str], Awaitable[Dict]],
+    job_id: Callable[[str], Optional[int]],
+) -> Prefetcher:
+    return Prefetcher(
+        cache, fetch, job_id,
+        top_n=int(os.getenv("PREFETCH_TOP_N", "0")),
+        workers=int(os.getenv("PREFETCH_WORKERS", "1")),
+    )
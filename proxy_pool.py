@@ -0,0 +1,145 @@
+import os
+import re
+import time
+import random
+import threading
+
+from typing import Dict, Iterable, List, Optional
+
+
+class ProxyStats:
+    __slots__ = ("url", "ok", "fail", "bans", "streak", "latency", "quarantined_until")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.ok = 0
+        self.fail = 0
+        self.bans = 0
+        self.streak = 0
+        self.latency: Optional[float] = None
+        self.quarantined_until = 0.0
+
+    def score(self) -> float:
+        success = (self.ok + 1) / (self.ok + self.fail + 2)
+        return success / (0.5 + (self.latency if self.latency is not None else 2.0))
+
+
+class ProxyPool:
+    """Пул проксі з proxies.txt: файл читається один раз і перечитується при зміні,
+    вибір зважений за успішністю та затримкою, проблемні проксі йдуть у карантин."""
+
+    def __init__(
+        self,
+        path: str,
+        quarantine: float = 60.0,
+        max_quarantine: float = 1800.0,
+        reload_interval: float = 5.0,
+        fail_streak: int = 2,
+    ):
+        self.path = path
+        self.quarantine = quarantine
+        self.max_quarantine = max_quarantine
+        self.reload_interval = reload_interval
+        self.fail_streak = fail_streak
+        self._proxies: Dict[str, ProxyStats] = {}
+        self._mtime: Optional[float] = None
+        self._checked = float("-inf")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _read(path: str) -> List[str]:
+        out = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                url = line.strip()
+                if url and not url.startswith("#"):
+                    out.append(url)
+        return out
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked < self.reload_interval:
+            return
+        self._checked = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        urls = self._read(self.path) if mtime is not None else []
+        self._proxies = {u: self._proxies.get(u) or ProxyStats(u) for u in dict.fromkeys(urls)}
+        print(f"[PROXY] loaded {len(self._proxies)} proxies")
+
+    def pick(self, exclude: Iterable[str] = ()) -> Optional[str]:
+        with self._lock:
+            self._maybe_reload()
+            skip = set(exclude)
+            cands = [p for u, p in self._proxies.items() if u not in skip] or list(self._proxies.values())
+            if not cands:
+                return None
+            now = time.monotonic()
+            live = [p for p in cands if p.quarantined_until <= now]
+            if not live:
+                return min(cands, key=lambda p: p.quarantined_until).url
+            return random.choices(live, weights=[p.score() for p in live])[0].url
+
+    def report(
+        self,
+        proxy: Optional[str],
+        ok: bool,
+        latency: Optional[float] = None,
+        banned: bool = False,
+    ) -> None:
+        if not proxy:
+            return
+        with self._lock:
+            self._maybe_reload()
+            p = self._proxies.get(proxy)
+            if p is None:
+                return
+            if latency is not None:
+                p.latency = latency if p.latency is None else 0.7 * p.latency + 0.3 * latency
+            if ok:
+                p.ok += 1
+                p.streak = 0
+                p.quarantined_until = 0.0
+                return
+            p.fail += 1
+            p.streak += 1
+            if banned:
+                p.bans += 1
+            if banned or p.streak >= self.fail_streak:
+                hold = min(self.max_quarantine, self.quarantine * 2 ** max(0, p.streak - 1))
+                p.quarantined_until = time.monotonic() + hold
+                print(f"[PROXY] quarantine {mask_proxy(proxy)} for {hold:.0f}s")
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            self._maybe_reload()
+            now = time.monotonic()
+            return [
+                {
+                    "proxy": mask_proxy(p.url),
+                    "ok": p.ok,
+                    "fail": p.fail,
+                    "bans": p.bans,
+                    "latency": round(p.latency, 3) if p.latency is not None else None,
+                    "score": round(p.score(), 3),
+                    "quarantined_for": max(0, round(p.quarantined_until - now)),
+                }
+                for p in self._proxies.values()
+            ]
+
+
+def mask_proxy(proxy: str) -> str:
+    return re.sub(r":([^:@/]+)@", r":***@", proxy)
+
+
+def proxy_pool_from_env(path: str) -> ProxyPool:
+    return ProxyPool(
+        path,
+        quarantine=float(os.getenv("PROXY_QUARANTINE", "60")),
+        max_quarantine=float(os.getenv("PROXY_MAX_QUARANTINE", "1800")),
+    )
@@ -0,0 +1,160 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+
+from enum import IntEnum
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    OPEN = 0
+    SEARCH = 1
+    REFRESH = 2
+    CRAWL = 3
+    PREFETCH = 4
+
+
+class QueueFull(Exception):
+    def __init__(self, depth: int):
+        super().__init__(f"scrape queue is full ({depth})")
+        self.depth = depth
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "stamp")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.stamp = time.monotonic()
+
+    def take(self) -> float:
+        """0 — токен взято; інакше скільки секунд чекати до наступного."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+
+class ScrapeScheduler:
+    """Єдина черга скрапінгу: глобальний ліміт слотів, класи пріоритету,
+    token bucket на користувача і обмежена глибина черги."""
+
+    def __init__(
+        self,
+        slots: int = 4,
+        max_queue: int = 50,
+        user_rate: float = 0.5,
+        user_burst: int = 5,
+    ):
+        self.slots = max(1, slots)
+        self.max_queue = max_queue
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self._active = 0
+        self._heap: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._buckets: Dict[int, TokenBucket] = {}
+        self.stats = {"submitted": 0, "queued": 0, "rejected": 0, "rate_limited": 0, "peak_depth": 0}
+
+    @property
+    def depth(self) -> int:
+        return sum(1 for _, _, fut in self._heap if not fut.done())
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def admit(self, user_id: Optional[int]) -> None:
+        """Піднімає RateLimited, якщо користувач вичерпав свій bucket."""
+        if user_id is None or self.user_rate <= 0:
+            return
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) > 10000:
+                self._buckets = {u: b for u, b in self._buckets.items() if b.tokens < b.capacity}
+            bucket = self._buckets[user_id] = TokenBucket(self.user_rate, self.user_burst)
+        wait = bucket.take()
+        if wait:
+            self.stats["rate_limited"] += 1
+            raise RateLimited(wait)
+
+    def _position(self, prio: int, seq: int) -> int:
+        return 1 + sum(1 for p, s, fut in self._heap if (p, s) < (prio, seq) and not fut.done())
+
+    def _release(self) -> None:
+        while self._heap:
+            _, _, fut = heapq.heappop(self._heap)
+            if not fut.done():
+                fut.set_result(None)  # слот переходить наступному в черзі
+                return
+        self._active -= 1
+
+    async def _acquire(
+        self, priority: Priority, on_queued: Optional[Callable[[int], Awaitable[None]]]
+    ) -> None:
+        if self._active < self.slots and not self.depth:
+            self._active += 1
+            return
+        depth = self.depth
+        limit = self.max_queue if priority < Priority.CRAWL else self.max_queue // 2
+        if depth >= limit:
+            self.stats["rejected"] += 1
+            raise QueueFull(depth)
+        fut = asyncio.get_running_loop().create_future()
+        seq = next(self._seq)
+        heapq.heappush(self._heap, (int(priority), seq, fut))
+        self.stats["queued"] += 1
+        self.stats["peak_depth"] = max(self.stats["peak_depth"], depth + 1)
+        try:
+            if on_queued is not None:
+                try:
+                    await on_queued(self._position(int(priority), seq))
+                except Exception as e:
+                    print("[SCHED] on_queued error", e)
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release()
+            else:
+                fut.cancel()
+            raise
+
+    async def submit(
+        self,
+        priority: Priority,
+        fn: Callable[[], Awaitable[T]],
+        on_queued: Optional[Callable[[int], Awaitable[None]]] = None,
+    ) -> T:
+        self.stats["submitted"] += 1
+        await self._acquire(priority, on_queued)
+        try:
+            return await fn()
+        finally:
+            self._release()
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "active": self._active, "depth": self.depth, "slots": self.slots}
+
+
+def scheduler_from_env(default_slots: int) -> ScrapeScheduler:
+    return ScrapeScheduler(
+        slots=int(os.getenv("SCRAPE_SLOTS", str(default_slots))),
+        max_queue=int(os.getenv("SCRAPE_MAX_QUEUE", "50")),
+        user_rate=float(os.getenv("SCRAPE_USER_RATE", "0.5")),
+        user_burst=int(os.getenv("SCRAPE_USER_BURST", "5")),
+    )
@@ -0,0 +1,293 @@
+import os
+import re
+import time
+import hashlib
+import asyncio
+import functools
+import contextvars
+
+import aiohttp
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from http_fetch import DEFAULT_HEADERS
+from metrics import inc, span
+from scraper_workua import (
+    DRIVER_POOL, PROXY_POOL, SCRAPER_BACKEND, PageGone, _GONE_STATUSES,
+    _pick_proxy, _pick_user_agent, _search_urls, _check_http_response, _job_id,
+    _get_html_selenium, parse_search_results, parse_workua_job,
+)
+
+ASYNC_CONCURRENCY = int(os.getenv("SCRAPER_ASYNC_CONCURRENCY", "50"))
+ASYNC_TIMEOUT = float(os.getenv("SCRAPER_ASYNC_TIMEOUT", "15"))
+PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS", "2"))
+SEARCH_MODE = os.getenv("SCRAPER_SEARCH_MODE", "concurrent").strip().lower()
+SEARCH_PAGES = int(os.getenv("SCRAPER_SEARCH_PAGES", "2"))
+SEARCH_FANOUT = int(os.getenv("SCRAPER_SEARCH_FANOUT", "4"))
+# вакансій на повній сторінці видачі Work.ua; коротша сторінка — остання
+SEARCH_PAGE_SIZE = max(1, int(os.getenv("SCRAPER_SEARCH_PAGE_SIZE", "14")))
+PARSE_MEMO_SIZE = int(os.getenv("SCRAPER_PARSE_MEMO_SIZE", "1000"))
+
+# розмітка, що змінюється з кожною відповіддю і не впливає на розбір: скрипти (крім JSON-LD,
+# його читає парсер), стилі, коментарі, приховані поля, csrf-мета, nonce- і data-атрибути
+_VOLATILE_RE = re.compile(
+    r"<script\b(?![^>]*application/ld\+json)[^>]*>.*?</script>"
+    r"|<(style|noscript)\b.*?</\1>"
+    r"|<!--.*?-->"
+    r"|<input\b[^>]*type\s*=\s*[\"']?hidden[^>]*>"
+    r"|<meta\b[^>]*name\s*=\s*[\"']?csrf[^>]*>"
+    r"|\s(?:nonce|data-[\w-]+)\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s>]+)",
+    re.S | re.I,
+)
+
+def _aiohttp_proxy_ok(proxy: Optional[str]) -> bool:
+    """aiohttp ходить лише через http(s)-проксі; socks5:// тощо лишаємо Selenium."""
+    return not proxy or urlsplit(proxy).scheme.lower() in ("http", "https")
+
+def _html_digest(html: str) -> bytes:
+    return hashlib.blake2b(_VOLATILE_RE.sub("", html).encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class AsyncScraper:
+    """Асинхронний рушій: aiohttp для HTTP, Selenium лише як запасний варіант.
+
+    Кількість одночасних HTTP-запитів обмежена семафором, Selenium і парсинг
+    виконуються у власних обмежених пулах, а не в executor за замовчуванням.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = ASYNC_CONCURRENCY,
+        timeout: float = ASYNC_TIMEOUT,
+        selenium_workers: Optional[int] = None,
+        parse_workers: int = PARSE_WORKERS,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._sem = asyncio.Semaphore(self.concurrency)
+        self._sessions: Dict[Optional[str], aiohttp.ClientSession] = {}
+        self._selenium = ThreadPoolExecutor(
+            max_workers=selenium_workers or DRIVER_POOL.size, thread_name_prefix="selenium")
+        self._parser = ThreadPoolExecutor(max_workers=parse_workers, thread_name_prefix="parse")
+        self._parsed: "OrderedDict[str, Tuple[bytes, Dict]]" = OrderedDict()
+        self.stats = {"parses": 0, "parse_memo_hits": 0}
+
+    def _session(self, proxy: Optional[str]) -> aiohttp.ClientSession:
+        s = self._sessions.get(proxy)
+        if s is None or s.closed:
+            headers = {k: v for k, v in DEFAULT_HEADERS.items() if k != "Accept-Encoding"}
+            headers["User-Agent"] = _pick_user_agent()
+            s = aiohttp.ClientSession(
+                headers=headers,
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300),
+            )
+            self._sessions[proxy] = s
+        return s
+
+    async def _get_http(self, url: str, proxy: Optional[str], page: Optional[str]) -> Optional[str]:
+        async with self._sem:
+            t0 = time.monotonic()
+            try:
+                with span("http.fetch", page=page or "-"):
+                    async with self._session(proxy).get(url, proxy=proxy) as r:
+                        status = r.status
+                        html = await r.text() if status == 200 else ""
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                PROXY_POOL.report(proxy, ok=False)
+                raise
+        usable, banned = _check_http_response(url, status, html, page)
+        PROXY_POOL.report(proxy, ok=not banned, latency=time.monotonic() - t0, banned=banned)
+        if status in _GONE_STATUSES:
+            raise PageGone(url)
+        return html if usable else None
+
+    async def _run(self, pool: ThreadPoolExecutor, fn, *args):
+        # контекст (request_id) переносимо в потік, як це робить asyncio.to_thread
+        ctx = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(pool, functools.partial(ctx.run, fn, *args))
+
+    async def fetch(
+        self,
+        url: str,
+        proxy: Optional[str] = None,
+        page: Optional[str] = None,
+        backend: Optional[str] = None,
+    ) -> str:
+        backend = (backend or SCRAPER_BACKEND).lower()
+        if backend in ("auto", "http") and not _aiohttp_proxy_ok(proxy):
+            # без проксі піти не можна (засвітимо свою адресу) — такий проксі вміє лише Chrome
+            if backend == "http":
+                raise RuntimeError(f"http backend: aiohttp does not support proxy {proxy!r}")
+            inc("scraper_fallbacks_total")
+        elif backend in ("auto", "http"):
+            try:
+                html = await self._get_http(url, proxy, page)
+                if html is not None:
+                    return html
+                if backend == "http":
+                    raise RuntimeError(f"http backend: unusable response for {url}")
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                # ValueError — aiohttp не прийняв адресу проксі
+                if backend == "http":
+                    raise
+                print(f"[SCRAPER] http error, fallback: {e!r}")
+            inc("scraper_fallbacks_total")
+        return await self._run(self._selenium, _get_html_selenium, url, proxy, 3, page)
+
+    async def search_workua_detailed(
+        self,
+        query: str,
+        limit: int = 10,
+        backend: Optional[str] = None,
+        mode: Optional[str] = None,
+        pages: Optional[int] = None,
+    ) -> List[Dict]:
+        """mode: "concurrent" (URL-и та сторінки 1..pages паралельно) або "sequential"."""
+        q = (query or "").strip()
+        if not q:
+            return []
+        if (mode or SEARCH_MODE) == "concurrent":
+            return await self._search_concurrent(q, limit, backend, pages or SEARCH_PAGES)
+        out: List[Dict] = []
+        proxy = _pick_proxy()
+        for search_url in _search_urls(q):
+            try:
+                html = await self.fetch(search_url, proxy, page="search", backend=backend)
+                out.extend(await self._run(self._parser, parse_search_results, html, limit - len(out)))
+                if len(out) >= limit:
+                    return out
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                continue
+        return out
+
+    @staticmethod
+    def _merge_unique(pages: Dict[int, List[Dict]]) -> List[Dict]:
+        out: List[Dict] = []
+        seen = set()
+        for i in sorted(pages):
+            for row in pages[i]:
+                key = _job_id(row["url"]) or row["url"]
+                if key not in seen:
+                    seen.add(key)
+                    out.append(row)
+        return out
+
+    async def _search_concurrent(
+        self, q: str, limit: int, backend: Optional[str], pages: int
+    ) -> List[Dict]:
+        proxy = _pick_proxy()
+        fanout = asyncio.Semaphore(max(1, SEARCH_FANOUT))
+        per_page = max(limit, SEARCH_PAGE_SIZE)  # не обрізаємо сторінку, щоб бачити, чи вона повна
+
+        async def one(i: int) -> Optional[List[Dict]]:
+            # гарний URL і ?search= дають ту саму видачу — другий лише як запасний
+            rows = None
+            for url in _search_urls(q, i + 1):
+                try:
+                    async with fanout:
+                        html = await self.fetch(url, proxy, page="search", backend=backend)
+                    return await self._run(self._parser, parse_search_results, html, per_page)
+                except asyncio.CancelledError:
+                    raise
+                except PageGone:
+                    rows = []  # сторінки за межами видачі немає — це кінець, а не збій
+                except Exception as e:
+                    print(f"[SCRAPER] search page error: {e!r}")
+            return rows
+
+        # одразу — лише сторінки, без яких limit не набрати; далі — по одній, поки попередні повні
+        tasks: Dict[int, asyncio.Future] = {}
+        for i in range(min(max(1, pages), -(-limit // SEARCH_PAGE_SIZE))):
+            tasks[i] = asyncio.ensure_future(one(i))
+        done: Dict[int, List[Dict]] = {}
+        last = max(1, pages)  # сторінки з індексом >= last не існують або не потрібні
+        try:
+            while True:
+                pending = [t for i, t in tasks.items() if i < last and not t.done()]
+                if pending:
+                    await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for i, t in tasks.items():
+                    if i in done or i >= last or not t.done():
+                        continue
+                    rows = t.result()
+                    done[i] = rows or []
+                    if rows is not None and len(rows) < SEARCH_PAGE_SIZE:
+                        last = i + 1  # неповна (чи порожня) сторінка — остання у видачі
+                for i, t in tasks.items():
+                    if i >= last:
+                        t.cancel()
+                # обрізаємо лише по суцільному префіксу сторінок 1..n, що вже завершились:
+                # сторінка 2, яка відповіла раніше, не може витіснити сторінку 1
+                n = 0
+                while n in done:
+                    n += 1
+                merged = self._merge_unique({j: r for j, r in done.items() if j < n})
+                if len(merged) >= limit or n >= last:
+                    return merged[:limit]
+                if n == len(tasks):
+                    tasks[n] = asyncio.ensure_future(one(n))
+        finally:
+            for t in tasks.values():
+                t.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    async def scrape_workua_job(self, url: str, backend: Optional[str] = None) -> Dict:
+        html = await self.fetch(url, _pick_proxy(), page="job", backend=backend)
+        if PARSE_MEMO_SIZE <= 0:  # мемо вимкнено (напр. бенчмарк міряє саме парсинг)
+            self.stats["parses"] += 1
+            return await self._run(self._parser, parse_workua_job, html, url)
+        digest = _html_digest(html)
+        memo = self._parsed.get(url)
+        if memo is not None and memo[0] == digest:
+            # та сама сторінка, що й минулого разу — парсинг не потрібен
+            self._parsed.move_to_end(url)
+            self.stats["parse_memo_hits"] += 1
+            inc("parse_skipped_total")
+            return dict(memo[1])
+        self.stats["parses"] += 1
+        job = await self._run(self._parser, parse_workua_job, html, url)
+        self._parsed[url] = (digest, job)
+        self._parsed.move_to_end(url)
+        while len(self._parsed) > PARSE_MEMO_SIZE:
+            self._parsed.popitem(last=False)
+        return dict(job)
+
+    async def close(self) -> None:
+        sessions, self._sessions = self._sessions, {}
+        for s in sessions.values():
+            await s.close()
+        self._selenium.shutdown(wait=False, cancel_futures=True)
+        self._parser.shutdown(wait=False, cancel_futures=True)
+
+
+_ENGINE: Optional[AsyncScraper] = None
+
+def get_engine() -> AsyncScraper:
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = AsyncScraper()
+    return _ENGINE
+
+async def search_workua_detailed_async(
+    query: str,
+    limit: int = 10,
+    backend: Optional[str] = None,
+    mode: Optional[str] = None,
+    pages: Optional[int] = None,
+) -> List[Dict]:
+    return await get_engine().search_workua_detailed(query, limit, backend, mode, pages)
+
+async def scrape_workua_job_async(url: str, backend: Optional[str] = None) -> Dict:
+    return await get_engine().scrape_workua_job(url, backend)
+
+async def close_engine() -> None:
+    global _ENGINE
+    if _ENGINE is not None:
+        await _ENGINE.close()
+        _ENGINE = None
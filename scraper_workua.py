@@ -1,19 +1,47 @@
 import os
 import re
+import json
 import time
 import random
+import shutil
+import socket
+import tempfile
+import threading
 import unicodedata
 
 from bs4 import BeautifulSoup
-from typing import Dict, List, Optional, Tuple
+from lxml import etree, html as lxml_html
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from urllib.parse import urlencode, urljoin
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+from driver_pool import PoolTimeout, pool_from_env
+from matchers import KeywordMatcher, PrefixMatcher
+from proxy_pool import mask_proxy, proxy_pool_from_env
+from http_fetch import HttpFetcher
+from metrics import inc, log, span, timed
+from structured import TYPED_FIELDS, extract_structured
 
 BASE_DIR = os.path.dirname(__file__)
 CHROMEDRIVER_PATH = os.path.join(BASE_DIR, "chromedriver", "chromedriver.exe")
-PROXIES_FILE = os.path.join(BASE_DIR, "proxies.txt")
+PROXIES_FILE = os.getenv("SCRAPER_PROXIES_FILE", os.path.join(BASE_DIR, "proxies.txt"))
+WORKUA_BASE_URL = os.getenv("WORKUA_BASE_URL", "https://www.work.ua").rstrip("/")
+VOCAB_FILE = os.getenv("SCRAPER_VOCAB_FILE", os.path.join(BASE_DIR, "vocab.json"))
+SCRAPER_BACKEND = os.getenv("SCRAPER_BACKEND", "auto").strip().lower()
+PAGE_LOAD_TIMEOUT = float(os.getenv("SCRAPER_PAGE_LOAD_TIMEOUT", "20"))
+READY_TIMEOUT = float(os.getenv("SCRAPER_READY_TIMEOUT", "10"))
+POLITE_DELAY = float(os.getenv("SCRAPER_POLITE_DELAY", "0"))
+POLITE_JITTER = float(os.getenv("SCRAPER_POLITE_JITTER", "0"))
+RETRY_DELAY = float(os.getenv("SCRAPER_RETRY_DELAY", "0.5"))
+STRUCTURED_DATA = os.getenv("SCRAPER_STRUCTURED", "1").strip().lower() not in ("0", "false", "no", "off")
+LEAN_PROFILE = os.getenv("SCRAPER_LEAN", "1").strip().lower() not in ("0", "false", "no", "off")
+PROFILE_ROOT = os.getenv("SCRAPER_PROFILE_DIR") or os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "workua-chrome")
 
 def _clean(s: Optional[str]) -> str:
     return re.sub(r"\s+", " ", s or "").strip()
@@ -34,16 +62,7 @@ def _pick_user_agent() -> str:
     ua = os.getenv("SCRAPER_UA", "").strip()
     return ua or random.choice(USER_AGENTS)
 
-def _load_proxies_from_file() -> List[str]:
-    if not os.path.isfile(PROXIES_FILE):
-        return []
-    out = []
-    with open(PROXIES_FILE, "r", encoding="utf-8") as f:
-        for line in f:
-            url = line.strip()
-            if url and not url.startswith("#"):
-                out.append(url)
-    return out
+PROXY_POOL = proxy_pool_from_env(PROXIES_FILE)
 
 def _pick_proxy() -> Optional[str]:
     env_proxy = (
@@ -54,14 +73,112 @@ def _pick_proxy() -> Optional[str]:
     ).strip()
     if env_proxy:
         return env_proxy
-    pool = _load_proxies_from_file()
-    return random.choice(pool) if pool else None
+    return PROXY_POOL.pick()
+
+def _next_proxy(failed: Optional[str]) -> Optional[str]:
+    if not failed:
+        return failed
+    return PROXY_POOL.pick(exclude=(failed,)) or failed
+
+# екстрактори читають лише DOM: картинки, шрифти, стилі, медіа й трекери — зайвий трафік
+BLOCKED_URLS = [
+    # хвостова зірочка — щоб ловити й версійовані адреси на кшталт app.css?v=123
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*",
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*", "*.css*", "*.mp4*", "*.webm*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*googleadservices.com*", "*facebook.net*", "*connect.facebook.com*",
+    "*hotjar.com*", "*mc.yandex.*", "*clarity.ms*", "*tiktok.com*", "*criteo.*",
+] + [u.strip() for u in os.getenv("SCRAPER_BLOCK_URLS", "").split(",") if u.strip()]
+
+_LEAN_ARGS = (
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--mute-audio",
+    "--blink-settings=imagesEnabled=false",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,AutofillServerCommunication",
+)
 
-def _mask_proxy_for_log(proxy: str) -> str:
-    return re.sub(r":([^:@/]+)@", r":***@", proxy)
+_LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+}
+
+_PROFILE_LOCK = threading.Lock()
+_PROFILES_CLAIMED: set = set()
+_PROFILES_SWEPT = False
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
 
-def _make_options_with_masking(proxy: Optional[str]) -> Options:
+def _chrome_holds(d: str) -> bool:
+    """Чи живий Chrome, що тримає SingletonLock (симлінк на "hostname-pid") у профілі."""
+    try:
+        target = os.readlink(os.path.join(d, "SingletonLock"))
+    except FileNotFoundError:
+        return False
+    except OSError:
+        return True  # не симлінк — не знаємо, чий він, тож не чіпаємо
+    host, _, pid = target.rpartition("-")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    return _pid_alive(int(pid))
+
+def _sweep_stale_profiles() -> None:
+    """Прибирає профілі процесів, що впали, не закривши Chrome: у /dev/shm вони
+    займають пам'ять, доки їх хтось не видалить."""
+    try:
+        names = os.listdir(PROFILE_ROOT)
+    except FileNotFoundError:
+        return
+    for name in names:
+        owner = name.split("-", 1)[0]
+        d = os.path.join(PROFILE_ROOT, name)
+        if not owner.isdigit() or int(owner) == os.getpid() or _pid_alive(int(owner)):
+            continue
+        if not _chrome_holds(d):
+            shutil.rmtree(d, ignore_errors=True)
+
+def _claim_profile_dir() -> str:
+    """Вільний каталог профілю в tmpfs. Каталоги перевикористовуються: новий драйвер
+    займає той, що звільнив перезапущений, а не створює профіль з нуля на диску."""
+    global _PROFILES_SWEPT
+    with _PROFILE_LOCK:
+        if not _PROFILES_SWEPT:
+            _PROFILES_SWEPT = True
+            _sweep_stale_profiles()
+        n = 0
+        while True:
+            d = os.path.join(PROFILE_ROOT, f"{os.getpid()}-{n}")
+            lock = os.path.join(d, "SingletonLock")
+            # SingletonLock тримає запущений Chrome; після quit() він зникає, а після падіння — лишається
+            if d not in _PROFILES_CLAIMED and os.path.lexists(lock) and not _chrome_holds(d):
+                os.unlink(lock)
+            if d not in _PROFILES_CLAIMED and not os.path.lexists(lock):
+                _PROFILES_CLAIMED.add(d)
+                os.makedirs(d, exist_ok=True)
+                return d
+            n += 1
+
+def _release_profile_dir(d: str) -> None:
+    with _PROFILE_LOCK:
+        _PROFILES_CLAIMED.discard(d)
+
+def _make_options_with_masking(proxy: Optional[str], profile_dir: Optional[str] = None) -> Options:
     opts = Options()
+    opts.page_load_strategy = "eager"
     opts.add_argument("--headless=new")
     opts.add_argument("--no-sandbox")
     opts.add_argument("--disable-dev-shm-usage")
@@ -70,50 +187,213 @@ def _make_options_with_masking(proxy: Optional[str]) -> Options:
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option("useAutomationExtension", False)
     opts.add_argument("--disable-blink-features=AutomationControlled")
+    # мережевий performance-лог — для обліку байтів на сторінку
+    opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    opts.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    if LEAN_PROFILE:
+        for arg in _LEAN_ARGS:
+            opts.add_argument(arg)
+        opts.add_experimental_option("prefs", _LEAN_PREFS)
+    if profile_dir:
+        opts.add_argument(f"--user-data-dir={profile_dir}")
 
     ua = _pick_user_agent()
     opts.add_argument(f"--user-agent={ua}")
 
     if proxy:
         opts.add_argument(f"--proxy-server={proxy}")
-        print(f"[SCRAPER] proxy: {_mask_proxy_for_log(proxy)}")
+        print(f"[SCRAPER] proxy: {mask_proxy(proxy)}")
     else:
         print("[SCRAPER] proxy: OFF")
     print(f"[SCRAPER] UA: {ua}")
     return opts
 
 def _build_driver(proxy: Optional[str]) -> webdriver.Chrome:
-    opts = _make_options_with_masking(proxy)
-    if os.path.isfile(CHROMEDRIVER_PATH):
-        return webdriver.Chrome(service=Service(CHROMEDRIVER_PATH), options=opts)
-    return webdriver.Chrome(options=opts)
+    profile_dir = _claim_profile_dir() if LEAN_PROFILE else None
+    opts = _make_options_with_masking(proxy, profile_dir)
+    try:
+        if os.path.isfile(CHROMEDRIVER_PATH):
+            driver = webdriver.Chrome(service=Service(CHROMEDRIVER_PATH), options=opts)
+        else:
+            driver = webdriver.Chrome(options=opts)
+    finally:
+        if profile_dir:
+            _release_profile_dir(profile_dir)  # далі каталог стереже SingletonLock самого Chrome
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    if LEAN_PROFILE and BLOCKED_URLS:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+        except Exception as e:
+            print("[SCRAPER] CDP blocking unavailable:", e)
+    return driver
+
+DRIVER_POOL = pool_from_env(_build_driver)
+HTTP_FETCHER = HttpFetcher(_pick_user_agent)
 
-def _get_html(url: str, proxy: Optional[str], attempts: int = 3) -> str:
+_CHALLENGE_RE = re.compile(
+    r"cf-chl|challenge-platform|just a moment\.\.\.|captcha|access denied|attention required",
+    re.I,
+)
+_JOB_LINK_RE = re.compile(r"""href=["']/jobs/\d+/?["']""")
+# видача без жодної вакансії — теж справжня сторінка пошуку, а не привід чекати в Chrome
+_EMPTY_SEARCH_RE = re.compile(
+    r"""id=["']pjax-jobs-list["']|нічого не знайдено|вакансій не знайдено|ничего не найдено""", re.I)
+
+def _looks_like_challenge(html: str) -> bool:
+    return bool(_CHALLENGE_RE.search(html[:20000]))
+
+def _has_markers(html: str, page: Optional[str]) -> bool:
+    if page == "job":
+        return 'id="job-description"' in html or "id='job-description'" in html
+    if page == "search":
+        return bool(_JOB_LINK_RE.search(html) or _EMPTY_SEARCH_RE.search(html))
+    return True
+
+class ChallengePage(Exception):
+    pass
+
+class PageGone(Exception):
+    """404/410: вакансію зняли чи сторінки видачі немає — ні повтор, ні Selenium не допоможуть."""
+
+_BAN_STATUSES = (403, 429)
+_GONE_STATUSES = (404, 410)
+
+def _check_http_response(url: str, status: int, html: str, page: Optional[str]) -> Tuple[bool, bool]:
+    """(придатна, ознака бану) для HTTP-відповіді."""
+    if status != 200:
+        print(f"[SCRAPER] http {status}: {url}")
+        return False, status in _BAN_STATUSES
+    if _has_markers(html, page) and not (page is None and _looks_like_challenge(html)):
+        return True, False
+    banned = _looks_like_challenge(html)
+    print(f"[SCRAPER] http: {'challenge page' if banned else 'no markers'}, fallback: {url}")
+    return False, banned
+
+def _get_html_http(url: str, proxy: Optional[str], page: Optional[str]) -> Optional[str]:
+    """HTML через HTTP-сесію або None, якщо сторінку треба віддати Selenium."""
+    t0 = time.monotonic()
+    try:
+        with span("http.fetch", page=page or "-"):
+            status, html = HTTP_FETCHER.get(url, proxy)
+    except Exception:
+        PROXY_POOL.report(proxy, ok=False)
+        raise
+    usable, banned = _check_http_response(url, status, html, page)
+    # 404 чи порожня видача — не вина проксі; рахуємо лише бан і збої з'єднання
+    PROXY_POOL.report(proxy, ok=not banned, latency=time.monotonic() - t0, banned=banned)
+    if status in _GONE_STATUSES:
+        raise PageGone(url)
+    return html if usable else None
+
+_SEARCH_READY_JS = (
+    "return !!document.getElementById('pjax-jobs-list')"
+    " || Array.from(document.querySelectorAll(\"a[href^='/jobs/']\"))"
+    ".some(a => /^\\/jobs\\/\\d+\\/?$/.test(a.getAttribute('href')));"
+)
+
+def _job_page_ready(driver) -> bool:
+    return bool(driver.find_elements(By.TAG_NAME, "h1")
+                and driver.find_elements(By.ID, "job-description"))
+
+def _search_page_ready(driver) -> bool:
+    return bool(driver.execute_script(_SEARCH_READY_JS))
+
+def _dom_ready(driver) -> bool:
+    return driver.execute_script("return document.readyState") != "loading"
+
+_READY = {"job": _job_page_ready, "search": _search_page_ready}
+
+def _wait_ready(driver, page: Optional[str]) -> None:
+    try:
+        WebDriverWait(driver, READY_TIMEOUT, poll_frequency=0.1).until(_READY.get(page, _dom_ready))
+    except TimeoutException:
+        # Порожня видача чи вакансія без опису — не привід для повтору, а от челендж — так.
+        if _looks_like_challenge(driver.page_source):
+            raise ChallengePage(driver.current_url)
+        print(f"[SCRAPER] page not ready after {READY_TIMEOUT}s: {driver.current_url}")
+
+SELENIUM_TRAFFIC = {"pages": 0, "bytes": 0, "requests": 0, "blocked": 0}
+
+def _record_traffic(driver, url: str, page: Optional[str]) -> None:
+    """Сумує encodedDataLength з performance-логу (буфер очищується при читанні):
+    байти, що реально пройшли через мережу/проксі за цю сторінку."""
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return
+    size = reqs = blocked = 0
+    for e in entries:
+        m = e.get("message", "")
+        if "Network.loadingFinished" in m:
+            size += int(json.loads(m)["message"]["params"].get("encodedDataLength", 0))
+            reqs += 1
+        elif "Network.loadingFailed" in m and "blockedReason" in m:
+            blocked += 1
+    SELENIUM_TRAFFIC["pages"] += 1
+    SELENIUM_TRAFFIC["bytes"] += size
+    SELENIUM_TRAFFIC["requests"] += reqs
+    SELENIUM_TRAFFIC["blocked"] += blocked
+    inc("scraper_page_bytes_total", size, backend="selenium", page=page or "-")
+    log("page_traffic", url=url, page=page, bytes=size, requests=reqs, blocked=blocked, lean=LEAN_PROFILE)
+
+def _polite_pause() -> None:
+    if POLITE_DELAY or POLITE_JITTER:
+        time.sleep(POLITE_DELAY + random.random() * POLITE_JITTER)
+
+def _get_html_selenium(url: str, proxy: Optional[str], attempts: int = 3, page: Optional[str] = None) -> str:
     last_err: Optional[Exception] = None
-    for _ in range(attempts):
-        driver = None
+    for i in range(attempts):
         try:
-            driver = _build_driver(proxy)
-            driver.get(url)
-            time.sleep(1.2 + random.random() * 0.9)
-            html = driver.page_source
-            driver.quit()
-            return html
+            with DRIVER_POOL.driver(proxy) as driver:
+                _polite_pause()
+                t0 = time.monotonic()
+                with span("selenium.navigate", page=page or "-"):
+                    driver.get(url)
+                with span("selenium.wait", page=page or "-"):
+                    _wait_ready(driver, page)
+                PROXY_POOL.report(proxy, ok=True, latency=time.monotonic() - t0)
+                html = driver.page_source
+                _record_traffic(driver, url, page)
+                return html
         except Exception as e:
             last_err = e
-            try:
-                if driver:
-                    driver.quit()
-            except Exception:
-                pass
-            pool = _load_proxies_from_file()
-            if pool:
-                proxy = random.choice(pool)
-            time.sleep(1.2)
+            if not isinstance(e, PoolTimeout):
+                PROXY_POOL.report(proxy, ok=False, banned=isinstance(e, ChallengePage))
+                proxy = _next_proxy(proxy)
+            if i + 1 < attempts:
+                inc("scraper_retries_total", backend="selenium", reason=type(e).__name__)
+                log("fetch_retry", level="warning", url=url, attempt=i + 1, error=repr(e))
+                time.sleep(RETRY_DELAY)
     if last_err:
         raise last_err
     return ""
 
+def _get_html(
+    url: str,
+    proxy: Optional[str],
+    attempts: int = 3,
+    page: Optional[str] = None,
+    backend: Optional[str] = None,
+) -> str:
+    """backend: "auto" (HTTP, Selenium як запасний), "http" або "selenium"."""
+    backend = (backend or SCRAPER_BACKEND).lower()
+    if backend in ("auto", "http"):
+        try:
+            html = _get_html_http(url, proxy, page)
+            if html is not None:
+                return html
+            if backend == "http":
+                raise RuntimeError(f"http backend: unusable response for {url}")
+        except PageGone:
+            raise
+        except Exception as e:
+            if backend == "http":
+                raise
+            print(f"[SCRAPER] http error, fallback: {e}")
+        inc("scraper_fallbacks_total")
+    return _get_html_selenium(url, proxy, attempts, page)
+
 _REMOTE_TOK = re.compile(r"\b(remote|віддалено|дистанційно)\b", re.I | re.U)
 
 def _strip_remote_token(q: str) -> Tuple[str, bool]:
@@ -123,28 +403,43 @@ def _strip_remote_token(q: str) -> Tuple[str, bool]:
 
 def _pretty_search_url(query: str, remote: bool) -> str:
     slug = re.sub(r"\s+", "+", query.strip())
-    base = f"https://www.work.ua/jobs{'-remote' if remote else ''}-{slug}/"
+    base = f"{WORKUA_BASE_URL}/jobs{'-remote' if remote else ''}-{slug}/"
     return f"{base}?notitle=1"
 
-def search_workua(query: str, limit: int = 5) -> List[str]:
+_JOB_ID_RE = re.compile(r"/jobs/(\d+)")
+
+def _job_id(url: str) -> Optional[int]:
+    m = _JOB_ID_RE.search(url or "")
+    return int(m.group(1)) if m else None
+
+def _search_key(q: str, limit: int) -> str:
+    q_clean, is_remote = _strip_remote_token((q or "").strip())
+    return f"{_norm(q_clean)}|{int(is_remote)}|{limit}"
+
+def _search_urls(q: str, page: int = 1) -> List[str]:
+    q_clean, is_remote = _strip_remote_token(q)
+    params = {"search": q_clean, "ss": "1", "notitle": "1"}
+    pretty = _pretty_search_url(q_clean, is_remote)
+    if page > 1:
+        params["page"] = str(page)
+        pretty += f"&page={page}"
+    return [pretty, f"{WORKUA_BASE_URL}/jobs/?" + urlencode(params)]
+
+def search_workua(query: str, limit: int = 5, backend: Optional[str] = None) -> List[str]:
     """Простий пошук (тільки URLів)."""
     q = (query or "").strip()
     if not q:
         return []
-    q_clean, is_remote = _strip_remote_token(q)
-    urls_to_try = [
-        _pretty_search_url(q_clean, is_remote),
-        "https://www.work.ua/jobs/?" + urlencode({"search": q_clean, "ss": "1", "notitle": "1"}),
-    ]
+    urls_to_try = _search_urls(q)
     found: List[str] = []
     proxy = _pick_proxy()
     for search_url in urls_to_try:
         try:
-            soup = BeautifulSoup(_get_html(search_url, proxy), "html.parser")
+            soup = BeautifulSoup(_get_html(search_url, proxy, page="search", backend=backend), "html.parser")
             for a in soup.find_all("a", href=True):
                 h = a["href"]
                 if re.fullmatch(r"/jobs/\d+/?", h):
-                    full = urljoin("https://www.work.ua", h)
+                    full = urljoin(WORKUA_BASE_URL, h)
                     if full not in found:
                         found.append(full)
                 if len(found) >= limit:
@@ -153,57 +448,142 @@ def search_workua(query: str, limit: int = 5) -> List[str]:
             continue
     return found
 
-def search_workua_detailed(query: str, limit: int = 10) -> List[Dict]:
+_JOB_HREF_RE = re.compile(r"/jobs/\d+/?")
+_SEARCH_SALARY_RE = re.compile(r"(\d[\d\s]+\s*(?:–|-)\s*\d[\d\s]+\s*грн|\d[\d\s]+\s*грн|₴\s*\d[\d\s]+)", re.I)
+
+def _lxml_doc(html: str):
+    """Корінь документа або None, якщо в ньому немає жодного елемента
+    (порожня відповідь, лише коментар чи XML-декларація)."""
+    try:
+        try:
+            el = lxml_html.fromstring(html)
+        except ValueError:
+            # рядок з <?xml encoding=...?> lxml приймає лише як bytes
+            el = lxml_html.fromstring(html.encode("utf-8"))
+    except etree.ParserError:  # "Document is empty"
+        return None
+    # fromstring повертає єдиний елемент body замість <html> — беремо корінь дерева
+    return el.getroottree().getroot()
+
+def _lx_text(el) -> str:
+    return _clean(" ".join(el.itertext()))
+
+def _card_of(a):
+    for el in a.iterancestors("div"):
+        if "card" in (el.get("class") or ""):
+            return el
+    return None
+
+def _parse_search_results_lxml(html: str, limit: int = 10) -> List[Dict]:
+    """Картки видачі: один прохід lxml по контейнеру #pjax-jobs-list.
+
+    Кожна картка — найближчий div з класом card навколо посилання /jobs/<id>,
+    тож зовнішні обгортки не дублюють результати.
+    """
+    doc = _lxml_doc(html) if html and html.strip() else None
+    if doc is None:
+        return []
+    host = doc.get_element_by_id("pjax-jobs-list", None)
+    if host is None:
+        host = doc
+
+    out: List[Dict] = []
+    seen = set()
+    for a_job in host.iter("a"):
+        href = a_job.get("href") or ""
+        if not _JOB_HREF_RE.fullmatch(href):
+            continue
+        card = _card_of(a_job)
+        if card is None or card in seen:
+            continue
+        seen.add(card)
+        url = urljoin(WORKUA_BASE_URL, href)
+        title = _lx_text(a_job)
+
+        company = "—"
+        for a_co in card.iter("a"):
+            if "/company/" in (a_co.get("href") or ""):
+                company = _lx_text(a_co)
+                break
+
+        raw = _lx_text(card)
+        m = _SEARCH_SALARY_RE.search(raw)
+        salary = _clean(m.group(1)) if m else "—"
+
+        found_emp = EMPLOYMENT_MATCHER.ordered(EMPLOYMENT_MATCHER.find(raw, whole_words=False))
+        employment = ", ".join(found_emp) if found_emp else "—"
+
+        out.append({
+            "url": url, "title": title, "company": company,
+            "salary": salary, "employment": employment
+        })
+        if len(out) >= limit:
+            break
+    return out
+
+def _parse_search_results_reference(html: str, limit: int = 10) -> List[Dict]:
+    """Попередній парсер (html.parser + обхід усіх div) — для порівняння у bench/."""
+    soup = BeautifulSoup(html, "html.parser")
+
+    cards = []
+    for div in soup.find_all("div"):
+        cls = " ".join(div.get("class", []))
+        if "card" in cls and "/jobs/" in div.decode().lower():
+            cards.append(div)
+
+    out: List[Dict] = []
+    for card in cards:
+        a_job = card.find("a", href=re.compile(r"^/jobs/\d+/?$"))
+        if not a_job:
+            continue
+        url = urljoin(WORKUA_BASE_URL, a_job["href"])
+        title = _clean(a_job.get_text(" "))
+
+        a_co = card.find("a", href=re.compile(r"/company/"))
+        company = _clean(a_co.get_text(" ")) if a_co else "—"
+
+        raw = _clean(card.get_text(" "))
+        m = re.search(r"(\d[\d\s]+\s*(?:–|-)\s*\d[\d\s]+\s*грн|\d[\d\s]+\s*грн|₴\s*\d[\d\s]+)", raw, re.I)
+        salary = _clean(m.group(1)) if m else "—"
+
+        found_emp = []
+        for kw in EMPLOYMENT_KEYWORDS:
+            if kw in raw and kw not in found_emp:
+                found_emp.append(kw)
+        employment = ", ".join(found_emp) if found_emp else "—"
+
+        out.append({
+            "url": url, "title": title, "company": company,
+            "salary": salary, "employment": employment
+        })
+        if len(out) >= limit:
+            break
+    return out
+
+SEARCH_PARSERS = {"lxml": _parse_search_results_lxml, "reference": _parse_search_results_reference}
+SEARCH_PARSER = os.getenv("SCRAPER_SEARCH_PARSER", "lxml").strip().lower()
+
+def parse_search_results(html: str, limit: int = 10, mode: Optional[str] = None) -> List[Dict]:
+    mode = (mode or SEARCH_PARSER).lower()
+    with span("parse.search", parser=mode):
+        return SEARCH_PARSERS[mode](html, limit)
+
+def search_workua_detailed(query: str, limit: int = 10, backend: Optional[str] = None) -> List[Dict]:
 
     q = (query or "").strip()
     if not q:
         return []
-    q_clean, is_remote = _strip_remote_token(q)
-    urls_to_try = [
-        _pretty_search_url(q_clean, is_remote),
-        "https://www.work.ua/jobs/?" + urlencode({"search": q_clean, "ss": "1", "notitle": "1"}),
-    ]
+    urls_to_try = _search_urls(q)
 
     out: List[Dict] = []
     proxy = _pick_proxy()
 
     for search_url in urls_to_try:
         try:
-            html = _get_html(search_url, proxy)
-            soup = BeautifulSoup(html, "html.parser")
-
-            cards = []
-            for div in soup.find_all("div"):
-                cls = " ".join(div.get("class", []))
-                if "card" in cls and "/jobs/" in div.decode().lower():
-                    cards.append(div)
-
-            for card in cards:
-                a_job = card.find("a", href=re.compile(r"^/jobs/\d+/?$"))
-                if not a_job:
-                    continue
-                url = urljoin("https://www.work.ua", a_job["href"])
-                title = _clean(a_job.get_text(" "))
-
-                a_co = card.find("a", href=re.compile(r"/company/"))
-                company = _clean(a_co.get_text(" ")) if a_co else "—"
-
-                raw = _clean(card.get_text(" "))
-                m = re.search(r"(\d[\d\s]+\s*(?:–|-)\s*\d[\d\s]+\s*грн|\d[\d\s]+\s*грн|₴\s*\d[\d\s]+)", raw, re.I)
-                salary = _clean(m.group(1)) if m else "—"
-
-                found_emp = []
-                for kw in EMPLOYMENT_KEYWORDS:
-                    if kw in raw and kw not in found_emp:
-                        found_emp.append(kw)
-                employment = ", ".join(found_emp) if found_emp else "—"
-
-                out.append({
-                    "url": url, "title": title, "company": company,
-                    "salary": salary, "employment": employment
-                })
-                if len(out) >= limit:
-                    return out
+            html = _get_html(search_url, proxy, page="search", backend=backend)
+            out.extend(parse_search_results(html, limit - len(out)))
+            if len(out) >= limit:
+                return out
         except Exception:
             continue
 
@@ -265,7 +645,28 @@ SECTION_TITLES = {
     ],
 }
 
-ALL_SECTION_TITLES = [*SECTION_TITLES["expect"], *SECTION_TITLES["tasks"]]
+def _load_vocab_file() -> Dict[str, List[str]]:
+    """Додаткові заголовки/ключові слова з JSON: {"expect": [...], "tasks": [...], "employment": [...]}."""
+    if not os.path.isfile(VOCAB_FILE):
+        return {}
+    with open(VOCAB_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {k: [str(x) for x in v] for k, v in data.items() if isinstance(v, list)}
+
+for _cat, _extra in _load_vocab_file().items():
+    if _cat == "employment":
+        EMPLOYMENT_KEYWORDS.extend(x for x in _extra if x not in EMPLOYMENT_KEYWORDS)
+    else:
+        SECTION_TITLES.setdefault(_cat, []).extend(_extra)
+
+ALL_SECTION_TITLES = [t for titles in SECTION_TITLES.values() for t in titles]
+
+SECTION_MATCHER = PrefixMatcher({cat: [_norm(t) for t in titles] for cat, titles in SECTION_TITLES.items()})
+EMPLOYMENT_MATCHER = KeywordMatcher(EMPLOYMENT_KEYWORDS)
+
+def _section_of(text: str) -> frozenset:
+    """Категорії, чий заголовок є префіксом уже нормалізованого text (порожньо — не заголовок)."""
+    return SECTION_MATCHER.match(text)
 
 def _is_section_heading(tag) -> bool:
     if not tag:
@@ -289,17 +690,15 @@ def _heading_text(tag) -> str:
             return _norm(b.get_text(" "))
     return ""
 
-def _extract_section_items(soup: BeautifulSoup, titles: List[str]) -> List[str]:
+@timed("extract.sections")
+def _extract_section_items(soup: BeautifulSoup, category: str) -> List[str]:
     host = soup.select_one("#job-description") or soup
-    want = tuple(_norm(t) for t in titles)
-    stop_set = tuple(_norm(t) for t in ALL_SECTION_TITLES)
 
     start = None
     for tag in host.find_all(["h2", "h3", "p", "strong", "b"]):
         if not _is_section_heading(tag):
             continue
-        head = _heading_text(tag)
-        if head.startswith(want):
+        if category in _section_of(_heading_text(tag)):
             start = tag
             break
 
@@ -319,7 +718,7 @@ def _extract_section_items(soup: BeautifulSoup, titles: List[str]) -> List[str]:
             if not line:
                 continue
             ln = re.sub(r"^[•\-\–—·]+\s*", "", line)
-            if _norm(ln).startswith(stop_set):
+            if _section_of(_norm(ln)):
                 continue
             if ln and ln not in items:
                 items.append(ln)
@@ -328,7 +727,7 @@ def _extract_section_items(soup: BeautifulSoup, titles: List[str]) -> List[str]:
         name = getattr(sib, "name", None)
         if not name:
             continue
-        if _is_section_heading(sib) and _heading_text(sib).startswith(stop_set):
+        if _is_section_heading(sib) and _section_of(_heading_text(sib)):
             break
         if name in ("ul", "ol"):
             for li in sib.find_all("li"):
@@ -337,8 +736,6 @@ def _extract_section_items(soup: BeautifulSoup, titles: List[str]) -> List[str]:
                     items.append(txt)
             continue
         if name == "p":
-            if _is_section_heading(sib) and _heading_text(sib).startswith(stop_set):
-                break
             add_lines_from_p(sib)
 
     if not items and start.name == "p":
@@ -352,68 +749,116 @@ def _extract_section_items(soup: BeautifulSoup, titles: List[str]) -> List[str]:
 
     return [i for i in items if len(i) > 1][:12]
 
-def _extract_company(soup: BeautifulSoup, page_text: str) -> str:
-    a = soup.select_one("a[href*='/company/']")
-    if a:
-        return _clean(a.get_text(" "))
-    og = soup.select_one('meta[property="og:description"]')
-    if og and og.get("content"):
-        m = re.search(r"компанія\s+(.+?)(?:[,—-]|робота|дистанційно)", og["content"], re.I)
+_OG_COMPANY_RE = re.compile(r"компанія\s+(.+?)(?:[,—-]|робота|дистанційно)", re.I)
+_TEXT_COMPANY_RE = re.compile(r"компанія\s+([^\n]+)", re.I)
+_SALARY_RE = re.compile(
+    r"((?:від|до)?\s*\d[\d\s]*\s*(?:–|-)\s*\d[\d\s]*\s*грн|від\s*\d[\д\s]*\s*грн|до\s*\d[\д\s]*\s*грн|\d[\д\s]*\s*грн|₴\s*\d[\д\s]*)",
+    re.I,
+)
+_POSTED_RE = re.compile(r"Вакансія від\s+([^\n]+?)(?:\.|$)", re.I)
+
+def _company_from_text(og_content: str, page_text: str) -> str:
+    if og_content:
+        m = _OG_COMPANY_RE.search(og_content)
         if m:
             return _clean(m.group(1))
-    m2 = re.search(r"компанія\s+([^\n]+)", page_text, re.I)
+    m2 = _TEXT_COMPANY_RE.search(page_text)
     if m2:
         return _clean(m2.group(1).split("робота")[0].split("дистанційно")[0])
     return "—"
 
-def _extract_salary(soup: BeautifulSoup, page_text: str) -> str:
-    pattern = r"((?:від|до)?\s*\d[\d\s]*\s*(?:–|-)\s*\d[\d\s]*\s*грн|від\s*\d[\д\s]*\s*грн|до\s*\d[\д\s]*\s*грн|\d[\д\s]*\s*грн|₴\s*\d[\д\s]*)"
-    og = soup.select_one('meta[property="og:description"]')
-    if og and og.get("content"):
-        m = re.search(pattern, og["content"], re.I)
+def _salary_from_text(og_content: str, page_text: str) -> str:
+    if og_content:
+        m = _SALARY_RE.search(og_content)
         if m:
             return _clean(m.group(1))
-    m2 = re.search(pattern, page_text, re.I)
+    m2 = _SALARY_RE.search(page_text)
     return _clean(m2.group(1)) if m2 else "—"
 
+def _posted_from(dt: str, page_text: str) -> str:
+    if dt and dt.strip():
+        return dt.strip().replace("T", " ").split(" ")[0]
+    m = _POSTED_RE.search(page_text)
+    return _clean(m.group(1)) if m else "—"
+
+def _og_description(soup: BeautifulSoup) -> str:
+    og = soup.select_one('meta[property="og:description"]')
+    return og.get("content") or "" if og else ""
+
+@timed("extract.company")
+def _extract_company(soup: BeautifulSoup, page_text: str) -> str:
+    a = soup.select_one("a[href*='/company/']")
+    if a:
+        return _clean(a.get_text(" "))
+    return _company_from_text(_og_description(soup), page_text)
+
+@timed("extract.salary")
+def _extract_salary(soup: BeautifulSoup, page_text: str) -> str:
+    return _salary_from_text(_og_description(soup), page_text)
+
+@timed("extract.posted")
 def _extract_posted(soup: BeautifulSoup, page_text: str) -> str:
     t = soup.select_one("time[datetime]")
-    if t and t.get("datetime"):
-        dt = t["datetime"].strip()
-        return dt.replace("T", " ").split(" ")[0]
-    m = re.search(r"Вакансія від\s+([^\n]+?)(?:\.|$)", page_text, re.I)
-    return _clean(m.group(1)) if m else "—"
+    return _posted_from(t.get("datetime", "") if t else "", page_text)
 
-def _extract_employment(soup: BeautifulSoup, page_text: str) -> str:
-    pills = set()
+def _employment_pills(soup: BeautifulSoup, page_text: str) -> Set[str]:
+    pills = EMPLOYMENT_MATCHER.find(page_text)
     h1 = soup.find("h1")
     if h1:
         for sib in h1.find_all_next(limit=60):
             txt = _clean(getattr(sib, "get_text", lambda *_: "")(" "))
-            for kw in EMPLOYMENT_KEYWORDS:
-                if kw in txt:
-                    pills.add(kw)
-    for kw in EMPLOYMENT_KEYWORDS:
-        if re.search(rf"(?<!\w){re.escape(kw)}(?!\w)", page_text):
-            pills.add(kw)
+            pills |= EMPLOYMENT_MATCHER.find(txt, whole_words=False)
+    return pills
+
+@timed("extract.employment")
+def _extract_employment(soup: BeautifulSoup, page_text: str) -> str:
+    pills = _employment_pills(soup, page_text)
     if not pills:
         return "—"
-    order = {k: i for i, k in enumerate(EMPLOYMENT_KEYWORDS)}
-    return ", ".join(sorted(pills, key=lambda x: order.get(x, 999)))
+    return ", ".join(EMPLOYMENT_MATCHER.ordered(pills))
 
-def scrape_workua_job(url: str) -> Dict:
-    proxy = _pick_proxy()
-    html = _get_html(url, proxy)
+def _structured(html: str) -> Dict:
+    if not STRUCTURED_DATA or not html:
+        return {}
+    with span("extract.structured"):
+        return extract_structured(html)
+
+def _employment(sd: Dict, heuristic: Callable[[], Set[str]]) -> str:
+    """Мітки зі schema.org доповнюються плашками сторінки, а не замінюють їх:
+    "Офіс" чи "Без досвіду" у employmentType не виражаються."""
+    labels = set(sd.get("employment_labels") or ())
+    pills = heuristic()
+    source = "structured" if labels else "heuristic" if pills else "missing"
+    inc("job_field_source_total", field="employment", source=source)
+    return ", ".join(EMPLOYMENT_MATCHER.ordered(labels | pills)) or "—"
+
+def _pick(field: str, sd: Dict, heuristic: Callable[[], str]) -> str:
+    """Поле зі структурованих даних; евристика запускається, лише якщо там його немає."""
+    value = sd.get(field)
+    if value:
+        source = "structured"
+    else:
+        value = heuristic()
+        source = "heuristic" if value and value != "—" else "missing"
+    inc("job_field_source_total", field=field, source=source)
+    return value
+
+def _typed(sd: Dict) -> Dict:
+    return {k: sd.get(k) for k in TYPED_FIELDS}
+
+def _parse_workua_job_reference(html: str, url: str) -> Dict:
+    """Попередній екстрактор (html.parser, кілька проходів) — еталон для порівняння."""
+    sd = _structured(html)
     soup = BeautifulSoup(html, "html.parser")
     page_text = _clean(soup.get_text(" "))
     h1 = soup.find("h1")
-    title = _clean(h1.get_text(" ")) if h1 else "—"
-    company = _extract_company(soup, page_text)
-    salary = _extract_salary(soup, page_text)
-    posted = _extract_posted(soup, page_text)
-    employment = _extract_employment(soup, page_text)
-    tasks = _extract_section_items(soup, SECTION_TITLES["tasks"])
-    expectations = _extract_section_items(soup, SECTION_TITLES["expect"])
+    title = _clean(h1.get_text(" ")) if h1 else sd.get("title", "—")
+    company = _pick("company", sd, lambda: _extract_company(soup, page_text))
+    salary = _pick("salary", sd, lambda: _extract_salary(soup, page_text))
+    posted = _pick("posted", sd, lambda: _extract_posted(soup, page_text))
+    employment = _employment(sd, lambda: _employment_pills(soup, page_text))
+    tasks = _extract_section_items(soup, "tasks")
+    expectations = _extract_section_items(soup, "expect")
     description: List[str] = []
     desc = soup.select_one("#job-description") or soup.select_one("div.card.wordwrap")
     if desc:
@@ -433,8 +878,201 @@ def scrape_workua_job(url: str) -> Dict:
         "tasks": tasks[:12],
         "expectations": expectations[:12],
         "description": description[:3],
+        **_typed(sd),
+    }
+
+_NO_TEXT_TAGS = ("script", "style", "template")
+_HEADING_TAGS = ("h2", "h3", "strong", "b")
+_BULLET_RE = re.compile(r"^[•\-\–—·]+\s*")
+
+def _lx_strings(el, skip=None):
+    tag = el.tag
+    if not isinstance(tag, str) or tag in _NO_TEXT_TAGS:
+        return
+    if el.text:
+        yield el.text
+    for ch in el:
+        if ch is not skip:
+            yield from _lx_strings(ch, skip)
+        if ch.tail:
+            yield ch.tail
+
+def _lx_heading_text(el) -> str:
+    """Те саме, що _is_section_heading + _heading_text, але для lxml: "" — не заголовок."""
+    tag = el.tag
+    if tag in _HEADING_TAGS:
+        return _norm(" ".join(el.itertext()))
+    if tag == "p":
+        for ch in el:
+            if ch.tag in ("b", "strong"):
+                return _norm(" ".join(ch.itertext()))
+    return ""
+
+def _lx_add_lines(p, items: List[str]) -> None:
+    for line in "\n".join(p.itertext()).split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        ln = _BULLET_RE.sub("", line)
+        if _section_of(_norm(ln)):
+            continue
+        if ln and ln not in items:
+            items.append(ln)
+
+def _lx_add_li(lis, items: List[str], limit: Optional[int] = None) -> None:
+    for li in lis:
+        txt = _lx_text(li)
+        if txt and txt not in items:
+            items.append(txt)
+        if limit and len(items) >= limit:
+            break
+
+def _lx_section_starts(host) -> Dict[str, object]:
+    starts: Dict[str, object] = {}
+    for el in host.iter("h2", "h3", "p", "strong", "b"):
+        head = _lx_heading_text(el)
+        if not head:
+            continue
+        for cat in _section_of(head):
+            starts.setdefault(cat, el)
+        if len(starts) == len(SECTION_MATCHER.categories):
+            break
+    return starts
+
+def _lx_section_items(host, start) -> List[str]:
+    items: List[str] = []
+    if start is None:
+        _lx_add_li(host.xpath(".//li[ancestor::ul]"), items, 12)
+        return items
+    for sib in start.itersiblings():
+        name = sib.tag
+        if not isinstance(name, str):
+            continue
+        if _section_of(_lx_heading_text(sib)):
+            break
+        if name in ("ul", "ol"):
+            _lx_add_li(sib.iter("li"), items)
+        elif name == "p":
+            _lx_add_lines(sib, items)
+    if not items and start.tag == "p":
+        _lx_add_lines(start, items)
+    if not items:
+        _lx_add_li(host.xpath(".//li[ancestor::ul]"), items)
+    return [i for i in items if len(i) > 1][:12]
+
+def _lx_scan_header(block, skip) -> Tuple[str, Optional[str], str]:
+    """Один обхід блоку заголовка (без #job-description): текст, компанія, datetime."""
+    parts: List[str] = []
+    found = {"company": None, "posted": ""}
+
+    def walk(el):
+        tag = el.tag
+        if not isinstance(tag, str) or tag in _NO_TEXT_TAGS:
+            return
+        if tag == "a" and found["company"] is None and "/company/" in (el.get("href") or ""):
+            found["company"] = _lx_text(el)
+        elif tag == "time" and not found["posted"] and el.get("datetime"):
+            found["posted"] = el.get("datetime")
+        if el.text:
+            parts.append(el.text)
+        for ch in el:
+            if ch is not skip:
+                walk(ch)
+            if ch.tail:
+                parts.append(ch.tail)
+
+    walk(block)
+    return _clean(" ".join(parts)), found["company"], found["posted"]
+
+def _parse_workua_job_lxml(html: str, url: str) -> Dict:
+    """Один розбір lxml; обходимо лише блок з h1, #job-description і meta."""
+    doc = _lxml_doc(html) if html and html.strip() else None
+    if doc is None:
+        doc = lxml_html.fromstring("<html></html>")  # порожня картка з "—", а не виняток
+    h1 = doc.find(".//h1")
+    desc = doc.get_element_by_id("job-description", None)
+
+    block = desc
+    if h1 is not None:
+        block = h1.getparent()
+        for el in h1.iterancestors("div"):
+            if "card" in (el.get("class") or ""):
+                block = el
+                break
+    if block is None:
+        block = doc
+
+    sd = _structured(html)
+    og_content = ""
+    # заголовок і опис потрібні завжди (плашки зайнятості є лише на сторінці);
+    # og:description — лише евристикам, тож, якщо JSON-LD дав решту, його не шукаємо
+    with span("extract.header"):
+        header_text, company_link, posted_dt = _lx_scan_header(block, desc)
+        desc_text = _clean(" ".join(_lx_strings(desc))) if desc is not None else ""
+        page_text = f"{header_text} {desc_text}".strip()
+    if not all(sd.get(f) for f in ("company", "salary", "posted")):
+        for meta in doc.iter("meta"):
+            if meta.get("property") == "og:description":
+                og_content = meta.get("content") or ""
+                break
+
+    with span("extract.company"):
+        company = _pick("company", sd, lambda: company_link or _company_from_text(og_content, page_text))
+    with span("extract.salary"):
+        salary = _pick("salary", sd, lambda: _salary_from_text(og_content, page_text))
+    with span("extract.posted"):
+        posted = _pick("posted", sd, lambda: _posted_from(posted_dt, page_text))
+    with span("extract.employment"):
+        employment = _employment(sd, lambda: (
+            EMPLOYMENT_MATCHER.find(header_text, whole_words=False) | EMPLOYMENT_MATCHER.find(desc_text)))
+
+    with span("extract.sections"):
+        host = desc if desc is not None else doc
+        starts = _lx_section_starts(host)
+        tasks = _lx_section_items(host, starts.get("tasks"))
+        expectations = _lx_section_items(host, starts.get("expect"))
+
+    description: List[str] = []
+    desc_host = desc
+    if desc_host is None:
+        found = doc.xpath('//div[contains(concat(" ", normalize-space(@class), " "), " card ")'
+                          ' and contains(concat(" ", normalize-space(@class), " "), " wordwrap ")]')
+        desc_host = found[0] if found else None
+    if desc_host is not None:
+        for p in desc_host.iter("p"):
+            txt = _lx_text(p)
+            if txt:
+                description.append(txt)
+            if len(description) >= 3:
+                break
+
+    return {
+        "url": url,
+        "title": (_lx_text(h1) if h1 is not None else "") or sd.get("title") or "—",
+        "company": company or "—",
+        "salary": salary or "—",
+        "posted": posted or "—",
+        "employment": employment or "—",
+        "tasks": tasks,
+        "expectations": expectations,
+        "description": description[:3],
+        **_typed(sd),
     }
 
+JOB_PARSERS = {"lxml": _parse_workua_job_lxml, "reference": _parse_workua_job_reference}
+JOB_PARSER = os.getenv("SCRAPER_JOB_PARSER", "lxml").strip().lower()
+
+def parse_workua_job(html: str, url: str, mode: Optional[str] = None) -> Dict:
+    """mode: "lxml" (за замовчуванням) або "reference" — старий екстрактор для звірки."""
+    mode = (mode or JOB_PARSER).lower()
+    with span("parse.job", parser=mode):
+        return JOB_PARSERS[mode](html, url)
+
+def scrape_workua_job(url: str, backend: Optional[str] = None) -> Dict:
+    proxy = _pick_proxy()
+    html = _get_html(url, proxy, page="job", backend=backend)
+    return parse_workua_job(html, url)
+
 if __name__ == "__main__":
     q = "remote python django"
     from pprint import pprint
@@ -0,0 +1,290 @@
+import os
+import re
+import asyncio
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import Message
+
+from metrics import inc, log
+from scheduler import TokenBucket
+
+TELEGRAM_TEXT_LIMIT = 4096
+
+_TAG_RE = re.compile(r"<(/?)([a-zA-Z0-9-]+)([^>]*)>")
+
+
+def _tg_len(s: str) -> int:
+    # Telegram рахує довжину в UTF-16; сирий HTML довший за текст, тож оцінка з запасом
+    return len(s.encode("utf-16-le")) // 2
+
+
+def _cp_index(s: str, units: int) -> int:
+    """Найбільший індекс символу i, для якого s[:i] вміщується в `units` одиниць UTF-16."""
+    if _tg_len(s) == len(s):  # лише BMP — індекси збігаються
+        return min(units, len(s))
+    n = 0
+    for i, ch in enumerate(s):
+        n += 2 if ord(ch) > 0xFFFF else 1
+        if n > units:
+            return i
+    return len(s)
+
+
+def _safe_cut(s: str, limit: int) -> int:
+    """Позиція розрізу ≤ limit, що не припадає всередину тегу чи HTML-сутності."""
+    cut = limit
+    lt, gt = s.rfind("<", 0, cut), s.rfind(">", 0, cut)
+    if lt > gt:
+        cut = lt
+    amp = s.rfind("&", 0, cut)
+    if amp != -1 and ";" not in s[amp:cut]:
+        cut = amp
+    return cut if cut > 0 else limit
+
+
+def _open_tags(chunk: str, stack: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    stack = list(stack)
+    for closing, name, attrs in _TAG_RE.findall(chunk):
+        name = name.lower()
+        if not closing:
+            stack.append((name, f"<{name}{attrs}>"))
+        else:
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i][0] == name:
+                    del stack[i]
+                    break
+    return stack
+
+
+def split_html(text: str, limit: int = TELEGRAM_TEXT_LIMIT) -> List[str]:
+    """Ріже HTML-повідомлення на частини ≤ limit: спершу по абзацах, потім по рядках,
+    в крайньому разі по пробілах; відкриті теги закриваються й відкриваються знову."""
+    if _tg_len(text) <= limit:
+        return [text]
+    budget = limit - 200  # запас на теги, які доведеться закрити/відкрити на межі
+    pieces: List[str] = []
+    for para in text.split("\n\n"):
+        for line in para.split("\n"):
+            while _tg_len(line) > budget:
+                # бюджет у UTF-16, а різати треба за індексом символу (емодзі = 2 одиниці)
+                lim = _cp_index(line, budget)
+                cut = line.rfind(" ", 0, lim)
+                cut = _safe_cut(line, cut if cut > lim // 2 else lim)
+                pieces.append(line[:cut])
+                line = line[cut:].lstrip(" ")
+            pieces.append(line)
+        pieces.append("")  # межа абзацу
+    if pieces and pieces[-1] == "":
+        pieces.pop()
+
+    chunks: List[str] = []
+    stack: List[Tuple[str, str]] = []
+    cur: List[str] = []
+    cur_len = 0
+    prefix = ""
+    for piece in pieces:
+        add = _tg_len(piece) + 1
+        if cur and cur_len + add > budget:
+            body = prefix + "\n".join(cur).strip("\n")
+            stack = _open_tags(body, [])
+            chunks.append(body + "".join(f"</{n}>" for n, _ in reversed(stack)))
+            prefix = "".join(tag for _, tag in stack)
+            cur, cur_len = [], _tg_len(prefix)
+        cur.append(piece)
+        cur_len += add
+    if cur:
+        chunks.append(prefix + "\n".join(cur).strip("\n"))
+    return [c for c in chunks if c.strip()]
+
+
+class _PendingEdit:
+    __slots__ = ("text", "kwargs", "future")
+
+    def __init__(self, text: str, kwargs: Dict[str, Any], future: asyncio.Future):
+        self.text = text
+        self.kwargs = kwargs
+        self.future = future
+
+
+class TelegramSender:
+    """Вихідна черга повідомлень: глобальний і поканальний token bucket,
+    автоматичний backoff на RetryAfter, злиття правок (виграє остання)
+    і нарізка довгих карток на частини до 4096 символів."""
+
+    def __init__(
+        self,
+        bot: Bot,
+        global_rate: float = 25.0,
+        chat_rate: float = 1.0,
+        chat_burst: int = 3,
+        group_rate: float = 20 / 60,
+        max_retries: int = 3,
+    ):
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats: Dict[int, TokenBucket] = {}
+        self._edits: Dict[Tuple[int, int], _PendingEdit] = {}
+        self.stats = {"sent": 0, "edited": 0, "edits_merged": 0, "chunks": 0, "retry_after": 0, "waits": 0}
+
+    def _bucket(self, chat_id: int) -> TokenBucket:
+        b = self._chats.get(chat_id)
+        if b is None:
+            if len(self._chats) > 10000:
+                self._chats = {c: x for c, x in self._chats.items() if x.tokens < x.capacity}
+            # групи й канали (від'ємні id) Telegram обмежує значно суворіше
+            rate, burst = (self.group_rate, 1) if chat_id < 0 else (self.chat_rate, self.chat_burst)
+            b = self._chats[chat_id] = TokenBucket(rate, burst)
+        return b
+
+    async def _slot(self, chat_id: int) -> None:
+        for bucket in (self._bucket(chat_id), self._global):
+            while True:
+                wait = bucket.take()
+                if not wait:
+                    break
+                self.stats["waits"] += 1
+                await asyncio.sleep(wait)
+
+    async def _call(self, chat: int, fn, /, *args, reserved: bool = False, **kwargs):
+        """reserved=True — слот для першої спроби вже взято викликачем."""
+        for attempt in range(self.max_retries + 1):
+            if attempt or not reserved:
+                await self._slot(chat)
+            try:
+                return await fn(*args, **kwargs)
+            except TelegramRetryAfter as e:
+                if attempt >= self.max_retries:
+                    raise
+                self.stats["retry_after"] += 1
+                inc("telegram_retry_after_total")
+                log("telegram_retry_after", level="warning", chat_id=chat, retry_after=e.retry_after)
+                # пауза стосується всього бота, тож спорожняємо й глобальний bucket
+                self._global.tokens = min(self._global.tokens, 0)
+                await asyncio.sleep(e.retry_after)
+
+    async def send(self, chat_id: int, text: str, reply_markup=None, **kwargs) -> Message:
+        """Надсилає текст (за потреби кількома повідомленнями); клавіатура — під останнім."""
+        return (await self.send_all(chat_id, text, reply_markup=reply_markup, **kwargs))[-1]
+
+    async def send_all(self, chat_id: int, text: str, reply_markup=None, **kwargs) -> List[Message]:
+        """Як send(), але повертає всі частини — від першої до останньої."""
+        chunks = split_html(text)
+        if len(chunks) > 1:
+            self.stats["chunks"] += len(chunks)
+        out = []
+        for i, chunk in enumerate(chunks):
+            last = i == len(chunks) - 1
+            out.append(await self._call(
+                chat_id, self.bot.send_message, chat_id, chunk,
+                reply_markup=reply_markup if last else None, **kwargs,
+            ))
+            self.stats["sent"] += 1
+        return out
+
+    async def edit_all(
+        self, chat_id: int, message_ids: List[int], text: str, reply_markup=None, **kwargs
+    ) -> Tuple[List[int], bool]:
+        """Правка багаточастинного повідомлення на місці: i-та частина тексту йде в
+        i-те повідомлення, нестачу дописуємо новими, зайві видаляємо. Клавіатура —
+        під останньою частиною. Повертає (id частин, чи змінилось хоч щось)."""
+        chunks = split_html(text)
+        ids: List[int] = []
+        modified = False
+        for i, chunk in enumerate(chunks):
+            markup = reply_markup if i == len(chunks) - 1 else None
+            if i >= len(message_ids):
+                msg = await self._call(chat_id, self.bot.send_message, chat_id, chunk, reply_markup=markup, **kwargs)
+                self.stats["sent"] += 1
+                ids.append(msg.message_id)
+                modified = True
+                continue
+            try:
+                await self._call(
+                    chat_id, self.bot.edit_message_text, chunk,
+                    chat_id=chat_id, message_id=message_ids[i], reply_markup=markup, **kwargs,
+                )
+                self.stats["edited"] += 1
+                modified = True
+            except TelegramBadRequest as e:
+                if "message is not modified" not in str(e):
+                    raise
+            ids.append(message_ids[i])
+        for mid in message_ids[len(chunks):]:
+            modified = True
+            try:
+                await self._call(chat_id, self.bot.delete_message, chat_id, mid)
+            except TelegramBadRequest as e:  # старше 48 год видаляти не можна — лишаємо
+                log("telegram_delete_failed", level="warning", chat_id=chat_id, message_id=mid, error=str(e))
+        if len(chunks) > 1:
+            self.stats["chunks"] += len(chunks)
+        return ids, modified
+
+    async def edit(self, message: Message, text: str, **kwargs) -> Any:
+        """Редагує повідомлення; поки правка чекає на слот, нова правка того ж
+        повідомлення лише замінює текст — у Telegram піде тільки остання."""
+        key = (message.chat.id, message.message_id)
+        pending = self._edits.get(key)
+        if pending is not None:
+            pending.text, pending.kwargs = text, kwargs
+            self.stats["edits_merged"] += 1
+            return await asyncio.shield(pending.future)
+
+        fut = asyncio.get_running_loop().create_future()
+        pending = self._edits[key] = _PendingEdit(text, kwargs, fut)
+        try:
+            await self._slot(message.chat.id)
+            del self._edits[key]
+            result = await self._apply_edit(message, pending.text, pending.kwargs)
+            fut.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            self._forget(key, pending)
+            fut.cancel()
+            raise
+        except Exception as e:
+            self._forget(key, pending)
+            if not fut.done():
+                fut.set_exception(e)
+                fut.exception()  # позначаємо як отримане, якщо інших очікувачів нема
+            raise
+
+    def _forget(self, key: Tuple[int, int], pending: _PendingEdit) -> None:
+        if self._edits.get(key) is pending:
+            del self._edits[key]
+
+    async def _apply_edit(self, message: Message, text: str, kwargs: Dict[str, Any]) -> Any:
+        # разова правка: хвіст довгого тексту дописуємо новими повідомленнями;
+        # те, що правиться повторно (картки), має йти через edit_all()
+        chunks = split_html(text)
+        kwargs = dict(kwargs)
+        markup = kwargs.pop("reply_markup", None)
+        result = await self._call(
+            message.chat.id, self.bot.edit_message_text, chunks[0], reserved=True,
+            chat_id=message.chat.id, message_id=message.message_id,
+            reply_markup=markup if len(chunks) == 1 else None, **kwargs,
+        )
+        self.stats["edited"] += 1
+        if len(chunks) > 1:
+            self.stats["chunks"] += 1  # решту порахує send()
+            await self.send(message.chat.id, "\n\n".join(chunks[1:]), reply_markup=markup, **kwargs)
+        return result
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "pending_edits": len(self._edits)}
+
+
+def sender_from_env(bot: Bot) -> TelegramSender:
+    return TelegramSender(
+        bot,
+        global_rate=float(os.getenv("TG_GLOBAL_RATE", "25")),
+        chat_rate=float(os.getenv("TG_CHAT_RATE", "1")),
+        chat_burst=int(os.getenv("TG_CHAT_BURST", "3")),
+        group_rate=float(os.getenv("TG_GROUP_RATE_PER_MIN", "20")) / 60,
+    )
@@ -0,0 +1,197 @@
+import re
+import json
+import html as html_lib
+
+from typing import Dict, Iterator, List, Optional
+
+# типізовані поля, що завжди є у словнику вакансії (None, якщо джерело їх не дало)
+TYPED_FIELDS = ("salary_min", "salary_max", "currency", "salary_unit",
+                "employment_type", "date_posted", "valid_through")
+
+_LD_RE = re.compile(
+    r"<script\b[^>]*type\s*=\s*[\"']application/ld\+json[\"'][^>]*>(.*?)</script>", re.S | re.I)
+_META_RE = re.compile(r"<meta\s([^>]+)>", re.I)
+_ATTR_RE = re.compile(r"([\w:-]+)\s*=\s*([\"'])(.*?)\2", re.S)
+_SCOPE_RE = re.compile(
+    r"<(\w+)\b[^>]*\bitemtype\s*=\s*[\"'][^\"']*schema\.org/JobPosting[\"'][^>]*>", re.I)
+_NUM_RE = re.compile(r"\d+(?:[.,]\d+)*")
+# кома чи крапка з рівно трьома цифрами — роздільник тисяч; дробова лише остання ,d / ,dd
+_DECIMAL_RE = re.compile(r"[.,]\d{1,2}$|[.,]\d{4,}$")
+
+_EMPLOYMENT_LABELS = {
+    "FULL_TIME": "Повна зайнятість",
+    "PART_TIME": "Неповна зайнятість",
+    "INTERN": "Готові взяти студента",
+    "TELECOMMUTE": "Дистанційна робота",
+}
+_CURRENCY_SIGNS = {"UAH": "грн", "USD": "$", "EUR": "€"}
+_UNIT_SUFFIX = {"HOUR": "/год", "DAY": "/день", "WEEK": "/тиждень", "YEAR": "/рік"}
+
+
+def _ld_nodes(data) -> Iterator[Dict]:
+    if isinstance(data, list):
+        for x in data:
+            yield from _ld_nodes(x)
+    elif isinstance(data, dict):
+        yield data
+        if "@graph" in data:
+            yield from _ld_nodes(data["@graph"])
+
+
+def _is_job_posting(node: Dict) -> bool:
+    t = node.get("@type")
+    return t == "JobPosting" or (isinstance(t, list) and "JobPosting" in t)
+
+
+def _job_posting(page: str) -> Optional[Dict]:
+    for m in _LD_RE.finditer(page):
+        try:
+            data = json.loads(m.group(1).strip(), strict=False)
+        except ValueError:
+            continue
+        for node in _ld_nodes(data):
+            if _is_job_posting(node):
+                return node
+    return None
+
+
+def _job_posting_scope(page: str) -> Optional[str]:
+    """Розмітка всередині елемента з itemtype=".../JobPosting" (до його закривного тегу)."""
+    m = _SCOPE_RE.search(page)
+    if m is None:
+        return None
+    tag, depth = m.group(1).lower(), 1
+    open_close = re.compile(rf"<(/?){tag}\b[^>]*?(/?)>", re.I)
+    for t in open_close.finditer(page, m.end()):
+        if t.group(2):
+            continue
+        depth += -1 if t.group(1) else 1
+        if depth == 0:
+            return page[m.end():t.start()]
+    return page[m.end():]
+
+
+def _microdata(page: str) -> Dict[str, str]:
+    """<meta itemprop=... content=...> усередині itemscope JobPosting — запасне джерело,
+    коли JSON-LD немає. Властивості інших сутностей сторінки (BreadcrumbList, Organization
+    у футері тощо) сюди не потрапляють."""
+    scope = _job_posting_scope(page)
+    props: Dict[str, str] = {}
+    if scope is None:
+        return props
+    for m in _META_RE.finditer(scope):
+        attrs = {k.lower(): v for k, _, v in _ATTR_RE.findall(m.group(1))}
+        if "itemprop" in attrs and "content" in attrs:
+            props.setdefault(attrs["itemprop"], html_lib.unescape(attrs["content"]).strip())
+    return props
+
+
+def _text(v) -> Optional[str]:
+    if isinstance(v, dict):
+        v = v.get("name")
+    if isinstance(v, list):
+        v = v[0] if v else None
+    if v is None:
+        return None
+    s = re.sub(r"\s+", " ", html_lib.unescape(str(v))).strip()
+    return s or None
+
+
+def _number(v) -> Optional[int]:
+    """Число з рядка: "50,000", "50.000" і "50 000" — тисячі; "1500,50" — дробове."""
+    if isinstance(v, bool) or v is None:
+        return None
+    if isinstance(v, (int, float)):
+        return int(v)
+    m = _NUM_RE.search(re.sub(r"\s", "", str(v)))
+    if not m:
+        return None
+    s = m.group(0)
+    frac = _DECIMAL_RE.search(s)
+    whole = s[:frac.start()] if frac else s
+    return int(re.sub(r"[.,]", "", whole))
+
+
+def _date(v) -> Optional[str]:
+    s = _text(v)
+    return s[:10] if s and re.match(r"\d{4}-\d{2}-\d{2}", s) else None
+
+
+def _codes(v) -> List[str]:
+    items = v if isinstance(v, list) else re.split(r"[,;]", v) if isinstance(v, str) else []
+    return [c for c in (str(x).strip().upper().replace("-", "_").replace(" ", "_") for x in items) if c]
+
+
+def _fmt_salary(lo: Optional[int], hi: Optional[int], currency: Optional[str], unit: Optional[str]) -> Optional[str]:
+    if lo is None and hi is None:
+        return None
+    num = lambda n: f"{n:,}".replace(",", " ")  # noqa: E731
+    if lo is not None and hi is not None and lo != hi:
+        s = f"{num(lo)} – {num(hi)}"
+    elif lo is not None and hi is not None:
+        s = num(lo)
+    else:
+        s = f"від {num(lo)}" if lo is not None else f"до {num(hi)}"
+    s += " " + _CURRENCY_SIGNS.get(currency or "UAH", currency or "грн")
+    return s + _UNIT_SUFFIX.get(unit or "", "")
+
+
+def extract_structured(page: str) -> Dict:
+    """Поля вакансії зі schema.org JobPosting (JSON-LD, далі microdata) без розбору DOM.
+
+    Повертає лише знайдене: типізовані salary_min/max, currency, salary_unit,
+    employment_type (коди schema.org), date_posted, valid_through, а також уже
+    відформатовані title/company/salary/posted/employment у вигляді, як їх дають
+    евристики, щоб ними можна було просто заповнити картку.
+    """
+    out: Dict = {}
+    node = _job_posting(page)
+    if node is not None:
+        out["title"] = _text(node.get("title"))
+        out["company"] = _text(node.get("hiringOrganization"))
+        base = node.get("baseSalary") or node.get("estimatedSalary") or {}
+        if isinstance(base, list):
+            base = base[0] if base else {}
+        value = base.get("value") if isinstance(base, dict) else base
+        if isinstance(value, dict):
+            lo, hi = _number(value.get("minValue")), _number(value.get("maxValue"))
+            if lo is None and hi is None:
+                lo = hi = _number(value.get("value"))
+            out["salary_unit"] = _text(value.get("unitText"))
+        else:
+            lo = hi = _number(value)
+        out["salary_min"], out["salary_max"] = lo, hi
+        out["currency"] = _text((base.get("currency") if isinstance(base, dict) else None)
+                                or node.get("salaryCurrency"))
+        codes = _codes(node.get("employmentType"))
+        if str(node.get("jobLocationType", "")).upper() == "TELECOMMUTE":
+            codes.append("TELECOMMUTE")
+        out["employment_type"] = codes or None
+        out["date_posted"] = _date(node.get("datePosted"))
+        out["valid_through"] = _date(node.get("validThrough"))
+    else:
+        props = _microdata(page)
+        if props:
+            lo, hi = _number(props.get("minValue")), _number(props.get("maxValue"))
+            if lo is None and hi is None:
+                lo = hi = _number(props.get("value"))
+            out.update(
+                salary_min=lo, salary_max=hi,
+                currency=props.get("currency") or props.get("salaryCurrency"),
+                salary_unit=props.get("unitText"),
+                employment_type=_codes(props.get("employmentType")) or None,
+                date_posted=_date(props.get("datePosted")),
+                valid_through=_date(props.get("validThrough")),
+            )
+    if not out:
+        return out
+    if out.get("currency"):
+        out["currency"] = out["currency"].upper()
+    if out.get("salary_unit"):
+        out["salary_unit"] = out["salary_unit"].upper()
+    out["salary"] = _fmt_salary(out.get("salary_min"), out.get("salary_max"), out.get("currency"),
+                                out.get("salary_unit"))
+    out["posted"] = out.get("date_posted")
+    labels = [_EMPLOYMENT_LABELS[c] for c in out.get("employment_type") or () if c in _EMPLOYMENT_LABELS]
+    out["employment_labels"] = labels or None
+    return {k: v for k, v in out.items() if v is not None}
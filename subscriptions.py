@@ -0,0 +1,252 @@
+import os
+import time
+import random
+import asyncio
+import sqlite3
+import threading
+
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from metrics import log
+
+
+class SubscriptionStore:
+    """Підписки на запити і множина вже побачених id вакансій на кожен запит (SQLite).
+
+    Запит ідентифікується нормалізованим ключем, тож однакові підписки різних
+    користувачів зводяться до одного запису в `queries`.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, seen_max: int = 2000):
+        self.seen_max = seen_max
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        self._seen: Dict[str, Set[int]] = {}
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS queries (
+                    key TEXT PRIMARY KEY, query TEXT, last_crawl REAL DEFAULT 0, primed INTEGER DEFAULT 0);
+                CREATE TABLE IF NOT EXISTS subs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, chat_id INTEGER, key TEXT, created REAL,
+                    UNIQUE (chat_id, key));
+                CREATE INDEX IF NOT EXISTS subs_key ON subs (key);
+                CREATE TABLE IF NOT EXISTS seen (key TEXT, job_id INTEGER, PRIMARY KEY (key, job_id));
+            """)
+            self._db.commit()
+
+    def subscribe(self, chat_id: int, key: str, query: str) -> bool:
+        """False, якщо така підписка вже є."""
+        with self._lock:
+            self._db.execute("INSERT OR IGNORE INTO queries (key, query) VALUES (?, ?)", (key, query))
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO subs (chat_id, key, created) VALUES (?, ?, ?)", (chat_id, key, time.time())
+            )
+            self._db.commit()
+            return cur.rowcount > 0
+
+    def _drop_orphans(self) -> None:
+        orphans = [k for (k,) in self._db.execute(
+            "SELECT key FROM queries WHERE key NOT IN (SELECT DISTINCT key FROM subs)")]
+        for k in orphans:
+            self._db.execute("DELETE FROM queries WHERE key = ?", (k,))
+            self._db.execute("DELETE FROM seen WHERE key = ?", (k,))
+            self._seen.pop(k, None)
+
+    def unsubscribe(self, chat_id: int, sub_id: Optional[int] = None, key: Optional[str] = None) -> int:
+        """Прибирає одну підписку (за id або ключем) чи всі підписки чату."""
+        with self._lock:
+            if sub_id is not None:
+                cur = self._db.execute("DELETE FROM subs WHERE chat_id = ? AND id = ?", (chat_id, sub_id))
+            elif key is not None:
+                cur = self._db.execute("DELETE FROM subs WHERE chat_id = ? AND key = ?", (chat_id, key))
+            else:
+                cur = self._db.execute("DELETE FROM subs WHERE chat_id = ?", (chat_id,))
+            self._drop_orphans()
+            self._db.commit()
+            return cur.rowcount
+
+    def list(self, chat_id: int) -> List[Tuple[int, str]]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT s.id, q.query FROM subs s JOIN queries q ON q.key = s.key"
+                " WHERE s.chat_id = ? ORDER BY s.id", (chat_id,)
+            ).fetchall()
+
+    def due(self, interval: float) -> List[Tuple[str, str, bool]]:
+        """(key, query, primed) запитів, які пора обійти."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, query, primed FROM queries WHERE last_crawl <= ? ORDER BY last_crawl",
+                (time.time() - interval,),
+            ).fetchall()
+        return [(k, q, bool(p)) for k, q, p in rows]
+
+    def subscribers(self, key: str) -> List[int]:
+        with self._lock:
+            return [c for (c,) in self._db.execute("SELECT chat_id FROM subs WHERE key = ?", (key,))]
+
+    def _seen_set(self, key: str) -> Set[int]:
+        s = self._seen.get(key)
+        if s is None:
+            s = self._seen[key] = {j for (j,) in self._db.execute("SELECT job_id FROM seen WHERE key = ?", (key,))}
+        return s
+
+    def mark_crawled(self, key: str, job_ids: List[int]) -> List[int]:
+        """Запам'ятовує id і повертає ті, яких раніше не було."""
+        with self._lock:
+            seen = self._seen_set(key)
+            new = [j for j in dict.fromkeys(job_ids) if j not in seen]
+            seen.update(new)
+            self._db.executemany("INSERT OR IGNORE INTO seen (key, job_id) VALUES (?, ?)", [(key, j) for j in new])
+            if len(seen) > self.seen_max:
+                # id на Work.ua зростають, тож найменші — найстаріші
+                drop = sorted(seen)[: len(seen) - self.seen_max]
+                seen.difference_update(drop)
+                self._db.executemany("DELETE FROM seen WHERE key = ? AND job_id = ?", [(key, j) for j in drop])
+            self._db.execute("UPDATE queries SET last_crawl = ?, primed = 1 WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return new
+
+    def touch(self, key: str) -> None:
+        with self._lock:
+            self._db.execute("UPDATE queries SET last_crawl = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            subs = self._db.execute("SELECT COUNT(*) FROM subs").fetchone()[0]
+            queries = self._db.execute("SELECT COUNT(*) FROM queries").fetchone()[0]
+        return {"subscriptions": subs, "queries": queries}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class SubscriptionCrawler:
+    """Раз на `interval` обходить кожен унікальний запит (а не кожного підписника)
+    і розсилає нові вакансії підписникам пачками по `batch_size`."""
+
+    def __init__(
+        self,
+        store: SubscriptionStore,
+        search: Callable[[str], Awaitable[List[Dict]]],
+        render: Callable[[str, List[Dict]], str],
+        notify: Callable[[int, str], Awaitable[None]],
+        job_id: Callable[[str], Optional[int]],
+        interval: float = 900.0,
+        concurrency: int = 2,
+        batch_size: int = 25,
+        batch_pause: float = 1.0,
+    ):
+        self.store = store
+        self._search = search
+        self._render = render
+        self._notify = notify
+        self._job_id = job_id
+        self.interval = interval
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.batch_pause = batch_pause
+        self._task: Optional[asyncio.Task] = None
+        self._sem = asyncio.Semaphore(self.concurrency)
+        self.stats = {"crawls": 0, "errors": 0, "new_jobs": 0, "notifications": 0, "notify_errors": 0}
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def _loop(self) -> None:
+        tick = min(60.0, self.interval / 4)
+        while True:
+            try:
+                due = await asyncio.to_thread(self.store.due, self.interval)
+                if due:
+                    await asyncio.gather(*(self._crawl(k, q, primed) for k, q, primed in due))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # цикл не має вмирати через один збій бази
+                self.stats["errors"] += 1
+                log("subs_loop_error", level="error", error=repr(e))
+            await asyncio.sleep(tick + random.random() * tick / 2)
+
+    async def _crawl(self, key: str, query: str, primed: bool) -> None:
+        try:
+            await self._crawl_one(key, query, primed)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # збій одного запиту не зупиняє решту обходу
+            self.stats["errors"] += 1
+            log("subs_crawl_failed", level="error", query=query, error=repr(e))
+
+    async def _crawl_one(self, key: str, query: str, primed: bool) -> None:
+        async with self._sem:
+            try:
+                rows = await self._search(query)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                log("subs_crawl_error", level="warning", query=query, error=repr(e))
+                await asyncio.to_thread(self.store.touch, key)  # наступна спроба — через interval, а не на кожному тіку
+                return
+        self.stats["crawls"] += 1
+        by_id = {}
+        for r in rows:
+            jid = self._job_id(r["url"])
+            if jid is not None:
+                by_id.setdefault(jid, r)
+        new = await asyncio.to_thread(self.store.mark_crawled, key, list(by_id))
+        if not primed or not new:
+            return  # перший обхід лише наповнює seen, щоб не засипати старими вакансіями
+        self.stats["new_jobs"] += len(new)
+        await self._fan_out(key, query, [by_id[j] for j in new])
+
+    async def _fan_out(self, key: str, query: str, rows: List[Dict]) -> None:
+        chats = await asyncio.to_thread(self.store.subscribers, key)
+        text = self._render(query, rows)  # один текст на запит, а не на підписника
+        for i in range(0, len(chats), self.batch_size):
+            if i:
+                await asyncio.sleep(self.batch_pause)
+            batch = chats[i:i + self.batch_size]
+            results = await asyncio.gather(
+                *(self._notify(c, text) for c in batch), return_exceptions=True
+            )
+            for chat_id, res in zip(batch, results):
+                if isinstance(res, Exception):
+                    self.stats["notify_errors"] += 1
+                    log("subs_notify_error", level="warning", chat_id=chat_id, error=repr(res))
+                else:
+                    self.stats["notifications"] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, **self.store.counts()}
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await asyncio.to_thread(self.store.close)
+
+
+def subscriptions_from_env(
+    search: Callable[[str], Awaitable[List[Dict]]],
+    render: Callable[[str, List[Dict]], str],
+    notify: Callable[[int, str], Awaitable[None]],
+    job_id: Callable[[str], Optional[int]],
+) -> SubscriptionCrawler:
+    store = SubscriptionStore(
+        os.getenv("SUBSCRIPTIONS_DB", "").strip() or None,
+        seen_max=int(os.getenv("SUBSCRIBE_SEEN_MAX", "2000")),
+    )
+    return SubscriptionCrawler(
+        store, search, render, notify, job_id,
+        interval=float(os.getenv("SUBSCRIBE_INTERVAL", "900")),
+        concurrency=int(os.getenv("SUBSCRIBE_CONCURRENCY", "2")),
+        batch_size=int(os.getenv("SUBSCRIBE_BATCH", "25")),
+        batch_pause=float(os.getenv("SUBSCRIBE_BATCH_PAUSE", "1")),
+    )
@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+
+from typing import Dict, List, Optional
+
+from metrics import inc, log
+from scraper_async import search_workua_detailed_async, scrape_workua_job_async
+from scraper_workua import _job_id, _search_key
+
+
+class RemoteTaskError(RuntimeError):
+    """Скрапер-воркер повернув помилку замість результату."""
+
+
+class LocalTaskQueue:
+    """Заміна спільної черги для одного процесу: задачі виконуються тут же."""
+
+    def __init__(self):
+        self.stats = {"submitted": 0}
+
+    async def search(self, query: str, limit: int) -> List[Dict]:
+        self.stats["submitted"] += 1
+        return await search_workua_detailed_async(query, limit)
+
+    async def job(self, url: str, fresh: bool = False) -> Dict:
+        self.stats["submitted"] += 1
+        return await scrape_workua_job_async(url)
+
+    def snapshot(self) -> Dict[str, int]:
+        return dict(self.stats)
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisTaskQueue:
+    """Черга задач скрапінгу в Redis, яку розбирають окремі процеси worker.py.
+
+    Задача — JSON у списку `<prefix>:tasks`; відповідь воркер кладе у список
+    `<prefix>:reply:<client>` цього клієнта, звідки її забирає один фоновий
+    слухач і будить відповідний future. Результати лежать і в спільному кеші
+    (`<prefix>:job:<id>`, `<prefix>:search:<key>`), тож повторний запит з будь-якої
+    репліки бота чи воркера не запускає браузер.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        prefix: str = "scrape",
+        timeout: float = 120.0,
+        job_ttl: float = 600.0,
+        search_ttl: float = 120.0,
+    ):
+        import redis.asyncio as aioredis  # опційна залежність, лише з REDIS_URL
+
+        self.redis = aioredis.from_url(redis_url)
+        self.prefix = prefix
+        self.timeout = timeout
+        self.job_ttl = job_ttl
+        self.search_ttl = search_ttl
+        self.tasks_key = f"{prefix}:tasks"
+        self.reply_key = f"{prefix}:reply:{uuid.uuid4().hex}"
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self.stats = {"submitted": 0, "cache_hits": 0, "timeouts": 0, "errors": 0}
+
+    # --- спільний кеш ------------------------------------------------------
+
+    def cache_key(self, kind: str, args: Dict) -> Optional[str]:
+        if kind == "search":
+            return f"{self.prefix}:search:{_search_key(args['query'], args['limit'])}"
+        job_id = _job_id(args["url"])
+        return f"{self.prefix}:job:{job_id}" if job_id is not None else None
+
+    async def cached(self, kind: str, args: Dict):
+        key = self.cache_key(kind, args)
+        raw = await self.redis.get(key) if key else None
+        return json.loads(raw) if raw else None
+
+    async def store(self, kind: str, args: Dict, result) -> None:
+        key = self.cache_key(kind, args)
+        if key:
+            ttl = self.search_ttl if kind == "search" else self.job_ttl
+            await self.redis.set(key, json.dumps(result, ensure_ascii=False), ex=max(1, int(ttl)))
+
+    # --- клієнт ------------------------------------------------------------
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                item = await self.redis.blpop([self.reply_key], timeout=5)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log("task_queue_listen_error", level="error", error=repr(e))
+                await asyncio.sleep(1)
+                continue
+            if item is None:
+                continue
+            msg = json.loads(item[1])
+            fut = self._pending.pop(msg["id"], None)
+            if fut is None or fut.done():
+                continue  # відповідь після таймауту
+            if msg.get("ok"):
+                fut.set_result(msg["result"])
+            else:
+                fut.set_exception(RemoteTaskError(msg.get("error", "worker error")))
+
+    async def _submit(self, kind: str, args: Dict):
+        hit = None if args.get("fresh") else await self.cached(kind, args)
+        if hit is not None:
+            self.stats["cache_hits"] += 1
+            return hit
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        task_id = uuid.uuid4().hex
+        fut = self._pending[task_id] = asyncio.get_running_loop().create_future()
+        msg = {"id": task_id, "kind": kind, "args": args, "reply": self.reply_key,
+               "deadline": time.time() + self.timeout}
+        self.stats["submitted"] += 1
+        inc("task_queue_submitted_total", kind=kind)
+        try:
+            await self.redis.lpush(self.tasks_key, json.dumps(msg, ensure_ascii=False))
+            return await asyncio.wait_for(fut, self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+        except RemoteTaskError:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self._pending.pop(task_id, None)
+
+    async def search(self, query: str, limit: int) -> List[Dict]:
+        return await self._submit("search", {"query": query, "limit": limit})
+
+    async def job(self, url: str, fresh: bool = False) -> Dict:
+        """fresh=True (кнопка «Оновити») минає спільний кеш і тут, і у воркера."""
+        return await self._submit("job", {"url": url, "fresh": fresh})
+
+    async def depth(self) -> int:
+        return await self.redis.llen(self.tasks_key)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "pending": len(self._pending)}
+
+    async def close(self) -> None:
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+        await self.redis.aclose()
+
+
+def redis_task_queue_from_env(redis_url: str) -> RedisTaskQueue:
+    return RedisTaskQueue(
+        redis_url,
+        prefix=os.getenv("SCRAPE_QUEUE_PREFIX", "scrape"),
+        timeout=float(os.getenv("SCRAPE_TASK_TIMEOUT", "120")),
+        job_ttl=float(os.getenv("DETAIL_CACHE_TTL", "600")),
+        search_ttl=float(os.getenv("SEARCH_CACHE_TTL", "120")),
+    )
+
+
+def task_queue_from_env():
+    """SCRAPE_QUEUE=redis віддає скрапінг воркерам через REDIS_URL; інакше — в цьому процесі."""
+    mode = os.getenv("SCRAPE_QUEUE", "local").strip().lower()
+    if mode != "redis":
+        return LocalTaskQueue()
+    redis_url = os.getenv("REDIS_URL", "").strip()
+    if not redis_url:
+        raise RuntimeError("SCRAPE_QUEUE=redis потребує REDIS_URL")
+    return redis_task_queue_from_env(redis_url)
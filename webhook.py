@@ -0,0 +1,117 @@
+import os
+import signal
+import asyncio
+import hashlib
+
+from typing import Callable, Dict, Optional
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from metrics import add_routes, log
+
+
+class WebhookServer:
+    """Приймає апдейти вебхуком на власному aiohttp-сервері замість long polling.
+
+    Кілька реплік за балансувальником можуть ділити один WEBHOOK_URL: кожна лише
+    повторно ставить той самий вебхук, а при зупинці його не знімає.
+    """
+
+    def __init__(
+        self,
+        dp: Dispatcher,
+        bot: Bot,
+        base_url: str,
+        path: str = "/webhook",
+        secret: Optional[str] = None,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        with_metrics: bool = False,
+        health: Optional[Callable[[], Dict]] = None,
+        drain_grace: float = 5.0,
+    ):
+        self.dp = dp
+        self.bot = bot
+        self.path = "/" + path.lstrip("/")
+        self.url = base_url.rstrip("/") + self.path
+        self.secret = secret
+        self.host = host
+        self.port = port
+        self.with_metrics = with_metrics
+        self._health = health
+        self.drain_grace = max(0.0, drain_grace)
+        self.draining = False
+
+    async def _on_health(self, _request: web.Request) -> web.Response:
+        body = {"status": "draining" if self.draining else "ok", "mode": "webhook"}
+        if self._health is not None:
+            body.update(self._health())
+        return web.json_response(body, status=503 if self.draining else 200)
+
+    async def _set_webhook(self, _app: web.Application) -> None:
+        await self.bot.set_webhook(
+            self.url,
+            secret_token=self.secret,
+            allowed_updates=self.dp.resolve_used_update_types(),
+        )
+        log("webhook_set", url=self.url)
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/healthz", self._on_health)
+        if self.with_metrics:
+            add_routes(app)
+        # порядок on_shutdown: спершу dp.shutdown (дренаж, закриття пулів), потім сесія бота
+        setup_application(app, self.dp, bot=self.bot)
+        SimpleRequestHandler(self.dp, self.bot, secret_token=self.secret).register(app, path=self.path)
+        app.on_startup.append(self._set_webhook)
+        return app
+
+    async def run(self) -> None:
+        """Працює до SIGTERM/SIGINT, далі — плавна зупинка.
+
+        Спершу /healthz `drain_grace` секунд віддає 503, поки сайти ще слухають, —
+        балансувальник встигає зняти репліку; лише потім runner.cleanup() закриває порт.
+        """
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:  # Windows
+                pass
+        runner = web.AppRunner(self.build_app(), access_log=None, handle_signals=False)
+        await runner.setup()
+        await web.TCPSite(runner, self.host, self.port).start()
+        log("webhook_listen", host=self.host, port=self.port, path=self.path)
+        try:
+            await stop.wait()
+            self.draining = True
+            log("webhook_drain", grace=self.drain_grace)
+            await asyncio.sleep(self.drain_grace)
+        finally:
+            self.draining = True
+            log("webhook_stop")
+            await runner.cleanup()
+
+
+def webhook_from_env(dp: Dispatcher, bot: Bot, token: str, metrics_port: int,
+                     health: Optional[Callable[[], Dict]] = None) -> WebhookServer:
+    base_url = os.getenv("WEBHOOK_URL", "").strip()
+    if not base_url:
+        raise RuntimeError("BOT_MODE=webhook потребує WEBHOOK_URL")
+    # однаковий для всіх реплік, якщо не задано явно: Telegram дозволяє [A-Za-z0-9_-]{1,256}
+    secret = os.getenv("WEBHOOK_SECRET", "").strip() or hashlib.sha256(token.encode()).hexdigest()
+    port = int(os.getenv("WEBHOOK_PORT", "8080"))
+    return WebhookServer(
+        dp, bot, base_url,
+        path=os.getenv("WEBHOOK_PATH", "/webhook"),
+        secret=secret,
+        host=os.getenv("WEBHOOK_HOST", "0.0.0.0"),
+        port=port,
+        with_metrics=metrics_port == port,
+        health=health,
+        drain_grace=float(os.getenv("WEBHOOK_DRAIN_GRACE", "5")),
+    )
@@ -0,0 +1,135 @@
+"""Скрапер-воркер: розбирає спільну чергу задач у Redis.
+
+    REDIS_URL=redis://redis:6379/0 python worker.py
+
+Бот з SCRAPE_QUEUE=redis лише кладе задачі в чергу; браузери й HTTP-скрапінг
+живуть тут, тож воркерів можна масштабувати окремо від бота й на інших вузлах.
+"""
+import os
+import json
+import time
+import signal
+import asyncio
+
+from typing import Dict, Set
+
+from metrics import (
+    REGISTRY, inc, log, new_request_id, span, stats_collector,
+    metrics_port_from_env, start_http_server)
+from scraper_async import search_workua_detailed_async, scrape_workua_job_async, close_engine
+from scraper_workua import DRIVER_POOL, SELENIUM_TRAFFIC
+from task_queue import RedisTaskQueue, redis_task_queue_from_env
+
+
+class ScrapeWorker:
+    """Бере до `concurrency` задач одночасно; спершу дивиться у спільний кеш,
+    результат кладе туди ж і у список відповідей клієнта."""
+
+    def __init__(self, queue: RedisTaskQueue, concurrency: int = 2):
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        self._sem = asyncio.Semaphore(self.concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self._stop = asyncio.Event()
+        self.stats = {"done": 0, "errors": 0, "expired": 0, "cache_hits": 0}
+
+    async def _execute(self, kind: str, args: Dict):
+        if not args.get("fresh"):
+            hit = await self.queue.cached(kind, args)
+            if hit is not None:
+                self.stats["cache_hits"] += 1
+                return hit
+        if kind == "search":
+            result = await search_workua_detailed_async(args["query"], args["limit"])
+        elif kind == "job":
+            result = await scrape_workua_job_async(args["url"])
+        else:
+            raise ValueError(f"unknown task kind: {kind}")
+        await self.queue.store(kind, args, result)
+        return result
+
+    async def _handle(self, raw: bytes) -> None:
+        msg = json.loads(raw)
+        new_request_id(f"t{msg['id'][:8]}-")
+        kind = msg.get("kind", "?")
+        if msg.get("deadline", 0) < time.time():
+            self.stats["expired"] += 1  # клієнт уже не чекає — не витрачаємо браузер
+            return
+        try:
+            with span("worker.task", kind=kind):
+                reply = {"id": msg["id"], "ok": True, "result": await self._execute(kind, msg["args"])}
+            self.stats["done"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            log("worker_task_error", level="error", kind=kind, error=repr(e))
+            reply = {"id": msg["id"], "ok": False, "error": repr(e)}
+        inc("worker_tasks_total", kind=kind, ok=str(reply["ok"]).lower())
+        r = self.queue.redis
+        await r.rpush(msg["reply"], json.dumps(reply, ensure_ascii=False))
+        await r.expire(msg["reply"], max(60, int(self.queue.timeout * 2)))  # кинуті клієнтом списки зникнуть
+
+    async def _run_one(self, raw: bytes) -> None:
+        try:
+            await self._handle(raw)
+        except Exception as e:
+            log("worker_error", level="error", error=repr(e))
+        finally:
+            self._sem.release()
+
+    async def run(self) -> None:
+        log("worker_start", queue=self.queue.tasks_key, concurrency=self.concurrency)
+        while not self._stop.is_set():
+            await self._sem.acquire()
+            try:
+                item = await self.queue.redis.brpop([self.queue.tasks_key], timeout=1)
+            except Exception as e:
+                self._sem.release()
+                log("worker_queue_error", level="error", error=repr(e))
+                await asyncio.sleep(1)
+                continue
+            if item is None:
+                self._sem.release()
+                continue
+            t = asyncio.create_task(self._run_one(item[1]))
+            self._tasks.add(t)
+            t.add_done_callback(self._tasks.discard)
+        # нових задач не беремо, взяті доробляємо
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        log("worker_stop", **self.stats)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "active": len(self._tasks)}
+
+
+async def main() -> None:
+    redis_url = os.getenv("REDIS_URL", "").strip()
+    if not redis_url:
+        raise SystemExit("worker.py потребує REDIS_URL")
+    queue = redis_task_queue_from_env(redis_url)
+    worker = ScrapeWorker(queue, int(os.getenv("WORKER_CONCURRENCY", str(DRIVER_POOL.size))))
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:  # Windows
+            pass
+    REGISTRY.register(stats_collector("worker", worker.snapshot, ("done", "errors", "expired", "cache_hits")))
+    REGISTRY.register(stats_collector("driver_pool", DRIVER_POOL.stats, ("created", "recycled")))
+    REGISTRY.register(stats_collector("selenium_traffic", lambda: SELENIUM_TRAFFIC, tuple(SELENIUM_TRAFFIC)))
+    port, host = metrics_port_from_env()
+    runner = await start_http_server(port, host) if port else None
+    try:
+        await worker.run()
+    finally:
+        await close_engine()
+        DRIVER_POOL.close()
+        await queue.close()
+        if runner is not None:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())